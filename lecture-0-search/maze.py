@@ -2,6 +2,9 @@
 # and finds the shortest path from the starting point to the endpoint,
 # if it exists
 
+from collections import Counter, deque
+
+
 class Node:
     def __init__(self, state, parent, action):
         self.state = state
@@ -11,13 +14,16 @@ class Node:
 
 class StackFrontier:
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Counts how many nodes in the frontier hold each state
+        self.states = Counter()
     
     def push(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
     
     def containsState(self, state):
-        return any(node.state == state for node in self.frontier)
+        return self.states[state] > 0
     
     def isEmpty(self):
         return len(self.frontier) == 0
@@ -26,18 +32,23 @@ class StackFrontier:
         if self.isEmpty():
             raise Exception("Empty StackFrontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discardState(node.state)
             return node
 
+    def discardState(self, state):
+        self.states[state] -= 1
+        if self.states[state] == 0:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
     def pop(self):
         if self.isEmpty():
             raise Exception("Empty QueueFrontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discardState(node.state)
             return node
 
 
@@ -127,7 +138,7 @@ class Maze:
             # Add neighboring nodes if they have not been explored and aren't in the frontier
             for d, a in self.getValidDirections(currNode):
                 newChild = Node(state=(d[0], d[1]), parent=currNode, action=a)
-                if newChild.state not in explored and not frontier.containsState(newChild):
+                if newChild.state not in explored and not frontier.containsState(newChild.state):
                     frontier.push(newChild)
 
     def getValidDirections(self, node):
@@ -0,0 +1,128 @@
+# Graph-wide statistics for the degrees data
+# Runs a breadth-first search from every person (or a random sample of
+# people), sharding the sources across a pool of worker processes
+
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+import degrees
+
+# Number of sources each worker takes from the pool at a time
+CHUNK_SIZE = 64
+
+
+def init_worker(directory, useSnapshot, lowMemory):
+    """
+    Makes sure a worker process has the graph loaded. Forked workers
+    share the parent's graph copy-on-write, so only workers started
+    from scratch need to load it, and with a snapshot they share its
+    memory-mapped pages through the operating system's page cache.
+    """
+    if degrees.graph.num_people() == 0:
+        degrees.load_data(directory, useSnapshot=useSnapshot, lowMemory=lowMemory)
+
+
+def explore_sources(sources):
+    """
+    Runs a breadth-first search from each source, returning the combined
+    histogram of distances and the eccentricity of every source.
+    """
+    histogram = Counter()
+    eccentricities = []
+    for source in sources:
+        counts = degrees.graph.distance_counts(source)
+        for distance in range(1, len(counts)):
+            histogram[distance] += counts[distance]
+        eccentricities.append((source, len(counts) - 1))
+    return histogram, eccentricities
+
+
+def analyze(directory, processes, sample, seed, useSnapshot=True, lowMemory=False):
+    """
+    Returns the distance histogram, per-person eccentricities and
+    component sizes of the graph, and the searches run per second.
+    """
+    graph = degrees.graph
+    sources = list(range(graph.num_people()))
+    if sample is not None and sample < len(sources):
+        sources = sorted(random.Random(seed).sample(sources, sample))
+    chunks = [sources[i:i + CHUNK_SIZE] for i in range(0, len(sources), CHUNK_SIZE)]
+
+    # Fork where possible so that workers inherit the loaded graph
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+
+    histogram = Counter()
+    eccentricities = {}
+    start = time.perf_counter()
+    with context.Pool(processes, initializer=init_worker,
+                      initargs=(directory, useSnapshot, lowMemory)) as pool:
+        for chunkHistogram, chunkEccentricities in pool.imap_unordered(explore_sources, chunks):
+            histogram.update(chunkHistogram)
+            eccentricities.update(chunkEccentricities)
+    elapsed = time.perf_counter() - start
+
+    componentSizes = Counter(graph.components())
+    return histogram, eccentricities, componentSizes, len(sources) / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph-wide statistics for degrees.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--sample", type=int,
+                        help="search from this many random people instead of everyone")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--eccentricities", metavar="FILE",
+                        help="write every searched person's eccentricity to a CSV file")
+    parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                        help="always parse the CSV files instead of using a snapshot")
+    parser.add_argument("--low-memory", dest="lowMemory", action="store_true",
+                        help="stream the CSV files into compact arrays instead of dicts")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory, useSnapshot=args.snapshot, lowMemory=args.lowMemory)
+    print("Data loaded.")
+
+    histogram, eccentricities, componentSizes, throughput = analyze(
+        args.directory, args.processes, args.sample, args.seed, args.snapshot, args.lowMemory
+    )
+    graph = degrees.graph
+
+    print(f"Searched from {len(eccentricities)} people with {args.processes} processes "
+          f"({throughput:.1f} sources per second).")
+
+    largestSize = componentSizes.most_common(1)[0][1] if componentSizes else 0
+    print(f"{len(componentSizes)} connected components, "
+          f"the largest has {largestSize} of {graph.num_people()} people.")
+
+    print("Degrees of separation between connected pairs:")
+    total = sum(histogram.values())
+    for distance in sorted(histogram):
+        share = histogram[distance] / total
+        print(f"    {distance:>3}: {histogram[distance]:>12} ({share:.2%})")
+
+    if eccentricities:
+        radius = min(eccentricities.values())
+        diameter = max(eccentricities.values())
+        print(f"Eccentricity ranges from {radius} to {diameter}.")
+
+    if args.eccentricities:
+        with open(args.eccentricities, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["person_id", "name", "eccentricity"])
+            for person in sorted(eccentricities):
+                writer.writerow([graph.personIds[person], graph.names[person], eccentricities[person]])
+
+
+if __name__ == "__main__":
+    main()
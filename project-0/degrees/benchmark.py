@@ -0,0 +1,247 @@
+# Benchmarks for degrees.py
+# Runs the search strategies over random pairs of people and
+# compares how many people each one has to explore, times the
+# search frontiers in util.py and name lookups, and measures memory
+# used by loading
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import degrees
+from nameindex import NameIndex
+from util import Node, QueueFrontier, StackFrontier
+
+
+def benchmark_search(directory, pairs, seed, hubs=None):
+    """
+    Runs every search strategy over the same random pairs of people,
+    checking that they agree on the degrees of separation.
+
+    If hubs is given, sources are drawn from only that many people,
+    as when many questions are asked about the same few actors.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.graph.personIds)
+    sources = rng.sample(person_ids, hubs) if hubs else person_ids
+    queries = []
+    while len(queries) < pairs:
+        source, target = rng.choice(sources), rng.choice(person_ids)
+        if source != target:
+            queries.append((source, target))
+
+    lengths = {}
+    for name, search in sorted(degrees.SEARCHES.items()):
+        explored = 0
+        start = time.perf_counter()
+        for source, target in queries:
+            stats = {}
+            path = search(source, target, stats=stats)
+            explored += stats["explored"]
+            length = None if path is None else len(path)
+            if lengths.setdefault((source, target), length) != length:
+                raise AssertionError(f"{name} disagrees on {source} -> {target}")
+        elapsed = time.perf_counter() - start
+        print(f"{name:>14}: {explored:>10} explored, {elapsed:8.3f}s for {pairs} pairs")
+
+
+class ListStackFrontier():
+    """
+    The original list-backed frontier, kept as a baseline: removing a node
+    copies the rest of the list and contains_state is a linear scan.
+    """
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def benchmark_frontier(size, probes):
+    """
+    Times filling and draining each frontier with `size` nodes,
+    with `probes` contains_state lookups while it is full.
+    """
+    frontiers = [
+        ("list stack", ListStackFrontier),
+        ("list queue", ListQueueFrontier),
+        ("stack", StackFrontier),
+        ("queue", QueueFrontier)
+    ]
+    for name, frontierClass in frontiers:
+        frontier = frontierClass()
+
+        start = time.perf_counter()
+        for state in range(size):
+            frontier.add(Node(state=state, parent=None, action=None))
+        added = time.perf_counter()
+        for state in range(0, size, max(1, size // probes)):
+            frontier.contains_state(state)
+        probed = time.perf_counter()
+        while not frontier.empty():
+            frontier.remove()
+        removed = time.perf_counter()
+
+        print(f"{name:>10}: add {added - start:8.3f}s, "
+              f"contains_state {probed - added:8.3f}s, "
+              f"remove {removed - probed:8.3f}s")
+
+
+def benchmark_names(directory, lookups, seed):
+    """
+    Times building the name index and looking up random names exactly,
+    by prefix, and with a typo.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    rng = random.Random(seed)
+    graph = degrees.graph
+    sample = [graph.names[rng.randrange(graph.num_people())] for _ in range(lookups)]
+
+    start = time.perf_counter()
+    index = NameIndex(graph.names)
+    built = time.perf_counter()
+    index.build_trigrams()
+    print(f"{'build':>8}: {built - start:8.3f}s sorted names, "
+          f"{time.perf_counter() - built:8.3f}s trigrams")
+
+    def typo(name):
+        i = rng.randrange(len(name))
+        return name[:i] + name[i + 1:]
+
+    lookupKinds = [
+        ("exact", index.exact, sample),
+        ("prefix", index.prefix, [name[:max(1, len(name) // 2)] for name in sample]),
+        ("fuzzy", index.fuzzy, [typo(name) for name in sample])
+    ]
+    for kind, lookup, queries in lookupKinds:
+        start = time.perf_counter()
+        for query in queries:
+            lookup(query)
+        elapsed = time.perf_counter() - start
+        print(f"{kind:>8}: {1000 * elapsed / len(queries):8.3f}ms per lookup")
+
+
+# Ways of loading the data compared by the memory benchmark
+LOAD_MODES = {
+    "dicts": {"useSnapshot": False, "lowMemory": False},
+    "low memory": {"useSnapshot": False, "lowMemory": True},
+    "snapshot": {"useSnapshot": True, "lowMemory": False},
+    "low memory snapshot": {"useSnapshot": True, "lowMemory": True}
+}
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_load(directory, mode):
+    """
+    Loads the data in the given mode and prints the time taken and
+    this process's peak memory as JSON.
+    """
+    before = peak_rss()
+    start = time.perf_counter()
+    degrees.load_data(directory, **LOAD_MODES[mode])
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "before": before, "after": peak_rss()}))
+
+
+def benchmark_memory(directory):
+    """
+    Loads the data once in each mode, each in a fresh process so that
+    peak memory is measured separately, and reports the peak RSS before
+    and after loading.
+    """
+    # Make sure a snapshot exists for the modes that read one
+    subprocess.run([sys.executable, __file__, "load", directory, "snapshot"],
+                   check=True, capture_output=True)
+
+    for mode in LOAD_MODES:
+        output = subprocess.run([sys.executable, __file__, "load", directory, mode],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f"{mode:>20}: {result['seconds']:8.3f}s, peak RSS "
+              f"{result['before']:8.1f} MB before loading, {result['after']:8.1f} MB after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees.py.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    search = subparsers.add_parser("search", help="compare search strategies")
+    search.add_argument("directory", nargs="?", default="large")
+    search.add_argument("--pairs", type=int, default=100,
+                        help="number of random source/target pairs")
+    search.add_argument("--seed", type=int, default=0)
+    search.add_argument("--hubs", type=int,
+                        help="draw sources from only this many people")
+
+    frontier = subparsers.add_parser("frontier", help="time frontier operations")
+    frontier.add_argument("--size", type=int, default=10 ** 5,
+                          help="number of nodes pushed through each frontier")
+    frontier.add_argument("--probes", type=int, default=1000,
+                          help="number of contains_state lookups")
+
+    names = subparsers.add_parser("names", help="time name index lookups")
+    names.add_argument("directory", nargs="?", default="large")
+    names.add_argument("--lookups", type=int, default=1000)
+    names.add_argument("--seed", type=int, default=0)
+
+    memory = subparsers.add_parser("memory", help="compare peak memory of loading modes")
+    memory.add_argument("directory", nargs="?", default="large")
+
+    # Used by the memory benchmark to load the data in a fresh process
+    load = subparsers.add_parser("load")
+    load.add_argument("directory")
+    load.add_argument("mode", choices=sorted(LOAD_MODES))
+
+    args = parser.parse_args()
+    if args.benchmark == "search":
+        benchmark_search(args.directory, args.pairs, args.seed, args.hubs)
+    elif args.benchmark == "frontier":
+        benchmark_frontier(args.size, args.probes)
+    elif args.benchmark == "names":
+        benchmark_names(args.directory, args.lookups, args.seed)
+    elif args.benchmark == "memory":
+        benchmark_memory(args.directory)
+    else:
+        measure_load(args.directory, args.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,18 @@
 # Given the name of two actors, displays the "path" from
 # one actor to another, if it exists
 
+import argparse
 import csv
+import functools
+import json
 import sys
+import threading
+from array import array
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import Graph, StringTable, build_csr
+from nameindex import NameIndex
+from server import serve
+from snapshot import read_snapshot, source_stamps, write_snapshot
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -16,10 +24,74 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed graph of people and movies, built from the dicts above
+graph = Graph.from_data(people, movies)
 
-def load_data(directory):
+# Sorted and trigram index over the names of the people in the graph
+nameIndex = NameIndex(graph.names)
+
+# Number of suggestions offered when a name is not found
+SUGGESTIONS = 5
+
+# Number of single-source BFS trees kept for repeated queries from the same person
+TREE_CACHE_SIZE = 8
+
+# The tree most recently computed, rather than found in the cache, by
+# bfs_tree in each thread, so the server's threads can tell their own
+# cache misses apart
+computedTrees = threading.local()
+
+
+def load_data(directory, useSnapshot=True, lowMemory=False):
     """
     Load data from CSV files into memory.
+
+    Unless useSnapshot is False, the data is read from a binary snapshot
+    next to the CSV files when one is up to date, and a fresh snapshot
+    is written after parsing the CSV files otherwise.
+
+    With lowMemory, the CSV files are streamed straight into the compact
+    graph and the names, people and movies dicts are left empty. They are
+    left empty when the graph is read from a snapshot too, since its ids
+    are looked up by binary search over the memory-mapped tables instead.
+    """
+    global graph, nameIndex
+
+    # Trees computed over any previously loaded graph are no longer valid
+    bfs_tree.cache_clear()
+    names.clear()
+    people.clear()
+    movies.clear()
+
+    # Stamp the CSV files before reading them, so any change made while
+    # they are parsed makes the new snapshot out of date
+    stamps = source_stamps(directory) if useSnapshot else None
+    snapshotGraph = read_snapshot(directory) if useSnapshot else None
+    if snapshotGraph is not None:
+        graph = snapshotGraph
+    elif lowMemory:
+        graph = load_compact_data(directory)
+    else:
+        load_csv_data(directory)
+
+        # Build the graph that the searches run on
+        graph = Graph.from_data(people, movies)
+
+    if graph.nameIndex is None:
+        graph.nameIndex = NameIndex(graph.names)
+    nameIndex = graph.nameIndex
+
+    if useSnapshot and snapshotGraph is None:
+        try:
+            write_snapshot(directory, graph, stamps)
+        except OSError:
+            # A read-only data directory just means no snapshot next time
+            pass
+
+
+def load_csv_data(directory):
+    """
+    Load people, movies and stars from the CSV files in directory.
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
@@ -56,94 +128,333 @@ def load_data(directory):
                 pass
 
 
+def load_compact_data(directory):
+    """
+    Stream the CSV files in directory into a graph without keeping
+    any per-row dicts, storing details as packed string columns and
+    the co-star relation as integer arrays.
+    """
+    # Load people
+    personIndex = {}
+    personIds, personNames, births = (StringTable.from_strings([]) for _ in range(3))
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        idColumn, nameColumn, birthColumn = (header.index(column) for column in ["id", "name", "birth"])
+        for row in reader:
+            person_id = sys.intern(row[idColumn])
+            if person_id in personIndex:
+                continue
+            personIndex[person_id] = len(personIds)
+            personIds.append(person_id)
+            personNames.append(row[nameColumn])
+            births.append(row[birthColumn])
+
+    # Load movies
+    movieIndex = {}
+    movieIds, titles, years = (StringTable.from_strings([]) for _ in range(3))
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        idColumn, titleColumn, yearColumn = (header.index(column) for column in ["id", "title", "year"])
+        for row in reader:
+            movie_id = sys.intern(row[idColumn])
+            if movie_id in movieIndex:
+                continue
+            movieIndex[movie_id] = len(movieIds)
+            movieIds.append(movie_id)
+            titles.append(row[titleColumn])
+            years.append(row[yearColumn])
+
+    # Load stars as two parallel arrays of integer edges
+    starPeople = array("i")
+    starMovies = array("i")
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        personColumn, movieColumn = (header.index(column) for column in ["person_id", "movie_id"])
+        for row in reader:
+            person = personIndex.get(row[personColumn])
+            movie = movieIndex.get(row[movieColumn])
+            if person is not None and movie is not None:
+                starPeople.append(person)
+                starMovies.append(movie)
+
+    personOffsets, movieOf = build_csr(len(personIds), starPeople, starMovies)
+    movieOffsets, starOf = build_csr(len(movieIds), starMovies, starPeople)
+
+    return Graph(personIds, personNames, births, movieIds, titles, years,
+                 personOffsets, movieOf, movieOffsets, starOf,
+                 personIndex=personIndex, movieIndex=movieIndex)
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation between two people.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=sorted(SEARCHES), default="bfs",
+                        help="search strategy used to find the shortest path")
+    parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                        help="always parse the CSV files instead of using a snapshot")
+    parser.add_argument("--paths", metavar="K", type=int,
+                        help="count the shortest paths and list up to K distinct paths, shortest first")
+    parser.add_argument("--low-memory", dest="lowMemory", action="store_true",
+                        help="stream the CSV files into compact arrays instead of dicts")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", metavar="FILE",
+                      help="answer tab-separated name pairs from FILE ('-' for stdin) as JSON lines")
+    mode.add_argument("--serve", metavar="PORT", type=int,
+                      help="keep the data loaded and answer queries over HTTP on localhost")
+    args = parser.parse_args()
+
+    # Keep standard output clean for JSON lines in batch mode
+    log = sys.stderr if args.batch or args.serve is not None else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
-
-    source = person_id_for_name(input("Name: "))
+    print("Loading data...", file=log)
+    load_data(args.directory, useSnapshot=args.snapshot, lowMemory=args.lowMemory)
+    print("Data loaded.", file=log)
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.search)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.search)
+        return
+    if args.serve is not None:
+        serve(answer_query, suggest_people, args.serve, log=log)
+        return
+
+    source = prompt_for_person()
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = prompt_for_person()
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.paths is not None:
+        print(f"{count_shortest_paths(source, target)} shortest paths.")
+        for number, path in enumerate(k_shortest_paths(source, target, args.paths), 1):
+            print(f"Path {number}:")
+            print_path(source, path)
+        return
+
+    path = SEARCHES[args.search](source, target)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
 
+def print_path(source, path):
+    """
+    Prints the degrees of separation along a path from the source.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = person_name(path[i][1])
+        person2 = person_name(path[i + 1][1])
+        movie = movie_title(path[i + 1][0])
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
-def shortest_path(source, target):
+
+def run_batch(lines, output, search):
+    """
+    Answers one query per line of tab-separated source and target names,
+    writing each answer to output as a line of JSON as soon as it is found.
+    """
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        try:
+            sourceName, targetName = line.split("\t")
+        except ValueError:
+            answer = {"query": line, "error": "expected a source and target name separated by a tab"}
+        else:
+            answer = answer_query(sourceName, targetName, search)
+        output.write(json.dumps(answer) + "\n")
+        output.flush()
+
+
+def answer_query(sourceName, targetName, search="bfs"):
+    """
+    Returns a JSON-serializable dict answering how a source and target
+    person are connected, without prompting when a name is ambiguous.
+    """
+    answer = {"source": sourceName, "target": targetName}
+    if search not in SEARCHES:
+        answer["error"] = f"unknown search '{search}'"
+        return answer
+
+    # Resolve both names, listing the candidates when one is ambiguous
+    ids = []
+    for name in [sourceName, targetName]:
+        person_ids = person_ids_for_name(name)
+        if len(person_ids) == 0:
+            answer["error"] = f"person '{name}' not found"
+            answer["suggestions"] = suggest_people(name)
+            return answer
+        elif len(person_ids) > 1:
+            answer["error"] = f"person '{name}' is ambiguous"
+            answer["candidates"] = [
+                {"person_id": person_id, "name": person_name(person_id), "birth": person_birth(person_id)}
+                for person_id in sorted(person_ids)
+            ]
+            return answer
+        ids.append(person_ids[0])
+
+    path = SEARCHES[search](ids[0], ids[1])
+    if path is None:
+        answer["degrees"] = None
+        answer["path"] = None
+    else:
+        answer["degrees"] = len(path)
+        answer["path"] = [
+            {"movie_id": movie_id, "movie": movie_title(movie_id),
+             "person_id": person_id, "person": person_name(person_id)}
+            for movie_id, person_id in path
+        ]
+    return answer
+
+
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    If no possible path, returns None. If a stats dict is given,
+    its "explored" key is set to the number of people expanded.
     """
+    return search_graph(graph.shortest_path, source, target, stats)
 
-    # Setting up variables to conduct breadth-first search
-    srcNode = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    exploredActors = set()
-    frontier.add(srcNode)
 
-    # Keep exploring the frontier while there are still actors in the queue
-    while not frontier.empty():
-        currNode = frontier.remove()
-        exploredActors.add(currNode.state)
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one search
+    frontier from each end and always expanding the smaller one.
 
-        # Get all actors that have starred in a movie with the current actor
-        for neighbor in neighbors_for_person(currNode.state):
-            # We've found the target actor, so we're done
-            if neighbor[1] == target:
-                movies = []
-                actors = []
+    If no possible path, returns None. If a stats dict is given,
+    its "explored" key is set to the number of people expanded.
+    """
+    return search_graph(graph.bidirectional_shortest_path, source, target, stats)
 
-                # Backtrack to get the path from source actor to target actor
-                neighborNode = Node(state=neighbor[1], parent=currNode, action=neighbor[0])
-                while neighborNode is not None:
-                    if neighborNode.action != None:
-                        movies.append(neighborNode.action)
-                    if neighborNode.state != source:
-                        actors.append(neighborNode.state)
-                    neighborNode = neighborNode.parent
-                
-                # Reorganize the lists so they are in the right order
-                movies.reverse()
-                actors.reverse()
 
-                # If these two lists aren't the same length, something is wrong
-                assert len(movies) == len(actors)
+def tree_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, read from a cached
+    BFS tree of everyone reachable from the source.
 
-                # Build the (movie_id, person_id) tuples and append them to the path
-                path = []
-                for i in range(len(movies)):
-                    path.append((movies[i], actors[i]))
+    If no possible path, returns None. If a stats dict is given,
+    its "explored" key is set to the number of people expanded,
+    which is zero when the source's tree was already cached.
+    """
+    computedTrees.tree = None
+    tree = bfs_tree(source)
+    if stats is not None:
+        stats["explored"] = tree.explored if computedTrees.tree is tree else 0
+
+    path = tree.path_to(graph.personIndex[target])
+    if path is None:
+        return None
+    return to_ids(path)
+
+
+def separation(source, target):
+    """
+    Returns the degrees of separation between the source and the target
+    using the source's cached BFS tree, or None if they are not connected.
+    """
+    return bfs_tree(source).distance_to(graph.personIndex[target])
+
+
+@functools.lru_cache(maxsize=TREE_CACHE_SIZE)
+def bfs_tree(source):
+    """
+    Returns the BFS tree of shortest paths from the source's person_id
+    to everyone they are connected to, computing it at most once while
+    it stays among the most recently used trees.
+    """
+    tree = graph.bfs_tree(graph.personIndex[source])
+    computedTrees.tree = tree
+    return tree
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns how many distinct shortest paths connect the source to
+    the target, without enumerating them.
+    """
+    dag = graph.shortest_path_dag(graph.personIndex[source], graph.personIndex[target])
+    return 0 if dag is None else dag.count()
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, one path at a time.
+    """
+    dag = graph.shortest_path_dag(graph.personIndex[source], graph.personIndex[target])
+    if dag is not None:
+        for path in dag.paths():
+            yield to_ids(path)
+
+
+def k_shortest_paths(source, target, k):
+    """
+    Yields up to k distinct lists of (movie_id, person_id) pairs that
+    connect the source to the target without revisiting anyone,
+    shortest first.
+    """
+    for path in graph.k_shortest_paths(graph.personIndex[source], graph.personIndex[target], k):
+        yield to_ids(path)
+
+
+def to_ids(path):
+    """
+    Translates a path of (movie, person) graph indexes to IMDB ids.
+    """
+    return [(graph.movieIds[movie], graph.personIds[person]) for movie, person in path]
+
+
+def search_graph(search, source, target, stats):
+    """
+    Runs a search over the integer-indexed graph and translates
+    the resulting path back to IMDB ids.
+    """
+    path = search(graph.personIndex[source], graph.personIndex[target], stats)
+    if path is None:
+        return None
+    return to_ids(path)
 
-                return path
 
-            # Only add a neighbor if we have not already explored their node and if they aren't already in the queue
-            if not frontier.contains_state(neighbor[1]) and neighbor[1] not in exploredActors:
-                newNode = Node(state=neighbor[1], parent=currNode, action=neighbor[0])
-                frontier.add(newNode)
+def prompt_for_person():
+    """
+    Prompts for a name until it matches someone, suggesting similar
+    names after each miss. Returns None when the input runs out or an
+    ambiguous name is not resolved.
+    """
+    while True:
+        try:
+            name = input("Name: ")
+        except EOFError:
+            return None
+
+        person_id = person_id_for_name(name)
+        if person_id is not None or person_ids_for_name(name):
+            return person_id
 
-    # If we've exhausted the entire queue and haven't found the target, there is no connection
-    return None
+        suggestions = suggest_people(name)
+        if not suggestions:
+            return None
+        print(f"No one is named '{name}'. Did you mean:")
+        for suggestion in suggestions:
+            print(f"    {suggestion['name']} (ID: {suggestion['person_id']}, Birth: {suggestion['birth']})")
 
 
 def person_id_for_name(name):
@@ -151,15 +462,14 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -172,18 +482,59 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns the list of IMDB ids for people with a given name.
+    """
+    # The names dict is left empty when the data was loaded with lowMemory
+    # or from a snapshot
+    if names:
+        return list(names.get(name.lower(), set()))
+    return [graph.personIds[person] for person in nameIndex.exact(name)]
+
+
+def suggest_people(name, limit=SUGGESTIONS):
+    """
+    Returns up to limit people whose names are similar to or start with
+    the given name, best match first, as JSON-serializable dicts.
+    """
+    return [
+        {"person_id": graph.personIds[person], "name": graph.names[person],
+         "birth": graph.births[person], "score": round(score, 3)}
+        for score, person in nameIndex.suggest(name, limit)
+    ]
+
+
+def person_name(person_id):
+    return graph.names[graph.personIndex[person_id]]
+
+
+def person_birth(person_id):
+    return graph.births[graph.personIndex[person_id]]
+
+
+def movie_title(movie_id):
+    return graph.titles[graph.movieIndex[movie_id]]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie, person in graph.neighbors(graph.personIndex[person_id]):
+        neighbors.add((graph.movieIds[movie], graph.personIds[person]))
     return neighbors
 
 
+# Search strategies selectable from the command line
+SEARCHES = {
+    "bfs": shortest_path,
+    "bidirectional": bidirectional_shortest_path,
+    "tree": tree_shortest_path
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,668 @@
+# Compact graph representation used by degrees.py
+# People and movies are numbered with consecutive integers, and the
+# edges between them are stored in flat arrays instead of nested dicts
+
+import heapq
+from array import array
+from collections import deque
+
+
+class Graph():
+    """
+    Bipartite graph of people and the movies they starred in, stored in
+    compressed sparse row (CSR) form.
+
+    The movies of person p are movieOf[personOffsets[p]:personOffsets[p + 1]],
+    and the stars of movie m are starOf[movieOffsets[m]:movieOffsets[m + 1]].
+    Two people are co-stars when they share a movie, so this holds the whole
+    co-star adjacency without materializing every pair of co-stars.
+    """
+
+    def __init__(self, personIds, names, births, movieIds, titles, years,
+                 personOffsets, movieOf, movieOffsets, starOf,
+                 personIndex=None, movieIndex=None, nameIndex=None):
+        # Map between integer indexes and IMDB ids, where the maps from ids
+        # to indexes can be dicts or IdIndexes over the id tables
+        self.personIds = personIds
+        self.movieIds = movieIds
+        if personIndex is None:
+            personIndex = {person_id: i for i, person_id in enumerate(personIds)}
+        if movieIndex is None:
+            movieIndex = {movie_id: i for i, movie_id in enumerate(movieIds)}
+        self.personIndex = personIndex
+        self.movieIndex = movieIndex
+
+        # Columns of per-person and per-movie details, indexed like the ids
+        self.names = names
+        self.births = births
+        self.titles = titles
+        self.years = years
+
+        # CSR arrays for both sides of the graph
+        self.personOffsets = personOffsets
+        self.movieOf = movieOf
+        self.movieOffsets = movieOffsets
+        self.starOf = starOf
+
+        # NameIndex over names, if one has been built or read with the graph
+        self.nameIndex = nameIndex
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Builds a graph from the people and movies dicts filled by load_data.
+        """
+        personIds = list(people)
+        movieIds = list(movies)
+        movieIndex = {movie_id: i for i, movie_id in enumerate(movieIds)}
+        personIndex = {person_id: i for i, person_id in enumerate(personIds)}
+
+        personOffsets = array("i", [0])
+        movieOf = array("i")
+        for person_id in personIds:
+            movieOf.extend(movieIndex[movie_id] for movie_id in people[person_id]["movies"])
+            personOffsets.append(len(movieOf))
+
+        movieOffsets = array("i", [0])
+        starOf = array("i")
+        for movie_id in movieIds:
+            starOf.extend(personIndex[person_id] for person_id in movies[movie_id]["stars"])
+            movieOffsets.append(len(starOf))
+
+        return cls(
+            StringTable.from_strings(personIds),
+            StringTable.from_strings(people[person_id]["name"] for person_id in personIds),
+            StringTable.from_strings(people[person_id]["birth"] for person_id in personIds),
+            StringTable.from_strings(movieIds),
+            StringTable.from_strings(movies[movie_id]["title"] for movie_id in movieIds),
+            StringTable.from_strings(movies[movie_id]["year"] for movie_id in movieIds),
+            personOffsets, movieOf, movieOffsets, starOf
+        )
+
+    def num_people(self):
+        return len(self.personIds)
+
+    def num_movies(self):
+        return len(self.movieIds)
+
+    def movies_for(self, person):
+        """
+        Returns the indexes of the movies a person starred in.
+        """
+        return self.movieOf[self.personOffsets[person]:self.personOffsets[person + 1]]
+
+    def stars_for(self, movie):
+        """
+        Returns the indexes of the people who starred in a movie.
+        """
+        return self.starOf[self.movieOffsets[movie]:self.movieOffsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with a given person, including the person themself.
+        """
+        personOffsets, movieOf = self.personOffsets, self.movieOf
+        movieOffsets, starOf = self.movieOffsets, self.starOf
+        for i in range(personOffsets[person], personOffsets[person + 1]):
+            movie = movieOf[i]
+            for j in range(movieOffsets[movie], movieOffsets[movie + 1]):
+                yield movie, starOf[j]
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie, person) index pairs that
+        connect the source to the target using breadth-first search.
+
+        If no possible path, returns None. If a stats dict is given,
+        its "explored" key is set to the number of people expanded.
+        """
+        if stats is not None:
+            stats["explored"] = 0
+        if source == target:
+            return []
+
+        # parentPerson[p] is -1 until p is reached, and the source is its own parent
+        parentPerson = array("i", [-1]) * self.num_people()
+        parentMovie = array("i", [-1]) * self.num_people()
+        parentPerson[source] = source
+        frontier = deque([source])
+
+        while frontier:
+            person = frontier.popleft()
+            if stats is not None:
+                stats["explored"] += 1
+
+            for movie, neighbor in self.neighbors(person):
+                if parentPerson[neighbor] != -1:
+                    continue
+                parentPerson[neighbor] = person
+                parentMovie[neighbor] = movie
+
+                # We've found the target, so backtrack to get the path
+                if neighbor == target:
+                    path = []
+                    while neighbor != source:
+                        path.append((parentMovie[neighbor], neighbor))
+                        neighbor = parentPerson[neighbor]
+                    path.reverse()
+                    return path
+
+                frontier.append(neighbor)
+
+        return None
+
+    def bfs_tree(self, source):
+        """
+        Returns the BFSTree of shortest paths from the source to everyone
+        reachable from them.
+        """
+        parentPerson = array("i", [-1]) * self.num_people()
+        parentMovie = array("i", [-1]) * self.num_people()
+        distance = array("i", [-1]) * self.num_people()
+        parentPerson[source] = source
+        distance[source] = 0
+        frontier = deque([source])
+        explored = 0
+
+        while frontier:
+            person = frontier.popleft()
+            explored += 1
+            for movie, neighbor in self.neighbors(person):
+                if distance[neighbor] == -1:
+                    parentPerson[neighbor] = person
+                    parentMovie[neighbor] = movie
+                    distance[neighbor] = distance[person] + 1
+                    frontier.append(neighbor)
+
+        return BFSTree(source, parentPerson, parentMovie, distance, explored)
+
+    def distance_counts(self, source):
+        """
+        Returns a list whose entry d is the number of people exactly d
+        degrees of separation from the source, so its last index is the
+        source's eccentricity within their connected component.
+        """
+        personOffsets, movieOf = self.personOffsets, self.movieOf
+        movieOffsets, starOf = self.movieOffsets, self.starOf
+
+        # Every star of a movie is reached at once, so each movie only needs
+        # to be scanned the first time any of its stars is expanded
+        seenPeople = bytearray(self.num_people())
+        seenMovies = bytearray(self.num_movies())
+        seenPeople[source] = 1
+        frontier = [source]
+        counts = [1]
+
+        while True:
+            nextFrontier = []
+            for person in frontier:
+                for i in range(personOffsets[person], personOffsets[person + 1]):
+                    movie = movieOf[i]
+                    if seenMovies[movie]:
+                        continue
+                    seenMovies[movie] = 1
+                    for j in range(movieOffsets[movie], movieOffsets[movie + 1]):
+                        neighbor = starOf[j]
+                        if not seenPeople[neighbor]:
+                            seenPeople[neighbor] = 1
+                            nextFrontier.append(neighbor)
+            if not nextFrontier:
+                return counts
+            counts.append(len(nextFrontier))
+            frontier = nextFrontier
+
+    def components(self):
+        """
+        Returns a list mapping each person to the index of their
+        connected component, numbering components from 0.
+        """
+        component = array("i", [-1]) * self.num_people()
+        count = 0
+        for start in range(self.num_people()):
+            if component[start] != -1:
+                continue
+            component[start] = count
+            frontier = [start]
+            while frontier:
+                person = frontier.pop()
+                for movie in self.movies_for(person):
+                    for neighbor in self.stars_for(movie):
+                        if component[neighbor] == -1:
+                            component[neighbor] = count
+                            frontier.append(neighbor)
+            count += 1
+        return component
+
+    def shortest_path_dag(self, source, target):
+        """
+        Returns the ShortestPathDAG holding every shortest path from the
+        source to the target, or None if they are not connected.
+        """
+        # Breadth-first search until the target is reached. At that point
+        # every layer before the target's is complete, which is all the
+        # distances needed to find the target's shortest-path predecessors.
+        distance = {source: 0}
+        frontier = deque([source])
+        while frontier and target not in distance:
+            person = frontier.popleft()
+            for movie, neighbor in self.neighbors(person):
+                if neighbor not in distance:
+                    distance[neighbor] = distance[person] + 1
+                    frontier.append(neighbor)
+                    if neighbor == target:
+                        break
+        if target not in distance:
+            return None
+
+        # Walk back from the target, keeping only people on a shortest path
+        predecessors = {source: []}
+        layer = [target]
+        while layer:
+            previousLayer = []
+            for person in layer:
+                steps = []
+                for movie, neighbor in self.neighbors(person):
+                    if distance.get(neighbor) == distance[person] - 1:
+                        steps.append((movie, neighbor))
+                        if neighbor not in predecessors:
+                            predecessors[neighbor] = None
+                            previousLayer.append(neighbor)
+                predecessors[person] = steps
+            layer = previousLayer
+
+        return ShortestPathDAG(source, target, distance[target], predecessors)
+
+    def k_shortest_paths(self, source, target, k):
+        """
+        Yields up to k distinct paths from the source to the target that
+        never revisit a person, as lists of (movie, person) index pairs,
+        shortest first.
+
+        All shortest paths come lazily from the shortest-path DAG, and if
+        there are fewer than k of them, Yen's algorithm finds longer ones.
+        """
+        if k <= 0:
+            return
+        dag = self.shortest_path_dag(source, target)
+        if dag is None:
+            return
+
+        found = []
+        for path in dag.paths():
+            yield path
+            found.append(path)
+            if len(found) == k:
+                return
+
+        # Yen's algorithm: deviate from each found path at each of its
+        # people, including every path the DAG produced. The candidates
+        # are kept across iterations and deduplicated.
+        candidates = []
+        seen = {tuple(path) for path in found}
+        expanded = 0
+        while len(found) < k:
+            for previous in found[expanded:]:
+                self.push_spur_paths(source, target, previous, found, candidates, seen)
+            expanded = len(found)
+
+            if not candidates:
+                return
+            _, path = heapq.heappop(candidates)
+            path = list(path)
+            yield path
+            found.append(path)
+
+    def push_spur_paths(self, source, target, previous, found, candidates, seen):
+        """
+        Pushes onto the candidates heap the shortest path that deviates
+        from a found path at each of its people, skipping paths already seen.
+        """
+        for i in range(len(previous)):
+            root = previous[:i]
+            spur = source if i == 0 else root[-1][1]
+
+            # Ban the next step of every found path sharing this root,
+            # and the people already on the root
+            bannedSteps = {
+                (spur, path[i]) for path in found
+                if len(path) > i and path[:i] == root
+            }
+            bannedPeople = {source} | {person for _, person in root}
+            bannedPeople.discard(spur)
+
+            spurPath = self.restricted_shortest_path(spur, target, bannedPeople, bannedSteps)
+            if spurPath is not None:
+                candidate = tuple(root + spurPath)
+                if candidate not in seen:
+                    seen.add(candidate)
+                    heapq.heappush(candidates, (len(candidate), candidate))
+
+    def restricted_shortest_path(self, source, target, bannedPeople, bannedSteps):
+        """
+        Returns the shortest list of (movie, person) index pairs from the
+        source to the target that avoids the banned people and the banned
+        (person, (movie, person)) steps, or None if there is no such path.
+        """
+        if source == target:
+            return []
+        parents = {source: None}
+        frontier = deque([source])
+        while frontier:
+            person = frontier.popleft()
+            for step in self.neighbors(person):
+                movie, neighbor = step
+                if neighbor in parents or neighbor in bannedPeople or (person, step) in bannedSteps:
+                    continue
+                parents[neighbor] = (movie, person)
+                if neighbor == target:
+                    path = []
+                    while parents[neighbor] is not None:
+                        movie, parent = parents[neighbor]
+                        path.append((movie, neighbor))
+                        neighbor = parent
+                    path.reverse()
+                    return path
+                frontier.append(neighbor)
+        return None
+
+    def bidirectional_shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie, person) index pairs that
+        connect the source to the target, growing one search frontier
+        from each end and always expanding the smaller one.
+
+        If no possible path, returns None. If a stats dict is given,
+        its "explored" key is set to the number of people expanded.
+        """
+        if stats is not None:
+            stats["explored"] = 0
+        if source == target:
+            return []
+
+        # Each side maps a person to the (movie, person) step that reached
+        # them: towards the source for the forward side, towards the target
+        # for the backward side. Only the people actually reached are stored.
+        forwardParents = {source: None}
+        backwardParents = {target: None}
+        forwardFrontier = [source]
+        backwardFrontier = [target]
+
+        while forwardFrontier and backwardFrontier:
+            # Expand a whole level of whichever frontier is smaller
+            if len(forwardFrontier) <= len(backwardFrontier):
+                frontier, parents, others = forwardFrontier, forwardParents, backwardParents
+            else:
+                frontier, parents, others = backwardFrontier, backwardParents, forwardParents
+
+            nextFrontier = []
+            for person in frontier:
+                if stats is not None:
+                    stats["explored"] += 1
+                for movie, neighbor in self.neighbors(person):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (movie, person)
+
+                    # The two searches have met, and since both grow a level at
+                    # a time the first meeting point lies on a shortest path
+                    if neighbor in others:
+                        return join_paths(forwardParents, backwardParents, neighbor)
+                    nextFrontier.append(neighbor)
+
+            if parents is forwardParents:
+                forwardFrontier = nextFrontier
+            else:
+                backwardFrontier = nextFrontier
+
+        return None
+
+
+class BFSTree():
+    """
+    Parent pointers and distances from a breadth-first search that
+    ran from one source until everyone reachable had been explored.
+    """
+
+    def __init__(self, source, parentPerson, parentMovie, distance, explored):
+        self.source = source
+        self.parentPerson = parentPerson
+        self.parentMovie = parentMovie
+        self.distance = distance
+        self.explored = explored
+
+    def distance_to(self, target):
+        """
+        Returns the degrees of separation to the target, or None if unreachable.
+        """
+        distance = self.distance[target]
+        return None if distance == -1 else distance
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie, person) index pairs that connect
+        the source to the target, in time proportional to the path's length.
+
+        If no possible path, returns None.
+        """
+        if self.distance[target] == -1:
+            return None
+        path = []
+        while target != self.source:
+            path.append((self.parentMovie[target], target))
+            target = self.parentPerson[target]
+        path.reverse()
+        return path
+
+
+class ShortestPathDAG():
+    """
+    Every shortest path between a source and a target, stored as the
+    predecessors of each person on any of them: predecessors[p] is a
+    list of (movie, person) steps one degree closer to the source.
+    """
+
+    def __init__(self, source, target, length, predecessors):
+        self.source = source
+        self.target = target
+        self.length = length
+        self.predecessors = predecessors
+
+    def count(self):
+        """
+        Returns the number of shortest paths, without enumerating them.
+        """
+        counts = {self.source: 1}
+
+        def paths_to(person):
+            # The DAG is at most as deep as the path length, so recursion is shallow
+            if person not in counts:
+                counts[person] = sum(paths_to(parent) for _, parent in self.predecessors[person])
+            return counts[person]
+
+        return paths_to(self.target)
+
+    def paths(self):
+        """
+        Yields every shortest path as a list of (movie, person) index pairs.
+        Paths are produced one at a time by a depth-first walk back from the
+        target, so memory stays proportional to the path length no matter
+        how many paths there are.
+        """
+        if self.source == self.target:
+            yield []
+            return
+
+        # steps holds the path walked back from the target so far, and
+        # stack holds the untried predecessors of each person on it
+        steps = []
+        people = [self.target]
+        stack = [iter(self.predecessors[self.target])]
+        while stack:
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                people.pop()
+                if steps:
+                    steps.pop()
+                continue
+
+            movie, parent = step
+            steps.append((movie, people[-1]))
+            if parent == self.source:
+                yield steps[::-1]
+                steps.pop()
+            else:
+                people.append(parent)
+                stack.append(iter(self.predecessors[parent]))
+
+
+class StringTable():
+    """
+    Read-only sequence of strings packed into one UTF-8 blob, where
+    string i is blob[offsets[i]:offsets[i + 1]].
+
+    The blob and offsets can be any buffers, including views into a
+    memory-mapped snapshot, so strings are only decoded when accessed.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_strings(cls, strings):
+        table = cls(array("q", [0]), bytearray())
+        for string in strings:
+            table.append(string)
+        return table
+
+    def append(self, string):
+        """
+        Adds a string to the end of a table that is still being built.
+        """
+        self.blob += string.encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        offsets, blob = self.offsets, self.blob
+        for i in range(len(self)):
+            yield str(blob[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def encoded(self, i):
+        """
+        Returns string i as UTF-8 bytes, without decoding it.
+        """
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+
+class IdIndex():
+    """
+    Read-only map from the strings of a StringTable to their indexes.
+
+    Strings are found by binary search over order, the indexes sorted by
+    their strings' UTF-8 bytes, so no dict holding every string is built
+    and order can be read straight from a memory-mapped snapshot.
+    """
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    @classmethod
+    def from_table(cls, table):
+        return cls(table, array("i", sorted(range(len(table)), key=table.encoded)))
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        i = self.get(key)
+        if i is None:
+            raise KeyError(key)
+        return i
+
+    def get(self, key, default=None):
+        encoded = key.encode("utf-8")
+        table, order = self.table, self.order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if table.encoded(order[middle]) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and table.encoded(order[low]) == encoded:
+            return order[low]
+        return default
+
+
+def build_csr(numRows, rows, columns):
+    """
+    Returns (offsets, values) arrays in compressed sparse row form for
+    the edges rows[i] -> columns[i], dropping repeated edges, using a
+    counting sort so no per-row Python containers are needed.
+    """
+    offsets = array("i", [0]) * (numRows + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for row in range(numRows):
+        offsets[row + 1] += offsets[row]
+
+    # Scatter each edge into the next free slot of its row
+    position = offsets[:-1]
+    values = array("i", [0]) * len(rows)
+    for row, column in zip(rows, columns):
+        values[position[row]] = column
+        position[row] += 1
+
+    # Compact the rows in place, keeping the first copy of each edge
+    write = 0
+    for row in range(numRows):
+        start, end = offsets[row], offsets[row + 1]
+        offsets[row] = write
+        seen = set()
+        for i in range(start, end):
+            if values[i] not in seen:
+                seen.add(values[i])
+                values[write] = values[i]
+                write += 1
+    offsets[numRows] = write
+    del values[write:]
+
+    return offsets, values
+
+
+def join_paths(forwardParents, backwardParents, meeting):
+    """
+    Returns the (movie, person) path through the person where the
+    forward and backward searches of a bidirectional search met.
+    """
+    # Walk back from the meeting point to the source
+    path = []
+    person = meeting
+    while forwardParents[person] is not None:
+        movie, parent = forwardParents[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    # Walk forward from the meeting point to the target
+    person = meeting
+    while backwardParents[person] is not None:
+        movie, child = backwardParents[person]
+        path.append((movie, child))
+        person = child
+
+    return path
@@ -0,0 +1,182 @@
+# Name index used by degrees.py
+# Finds people by exact name, by the start of their name, or by a
+# misspelled name, without scanning every name in the dataset
+
+import bisect
+import heapq
+import threading
+from array import array
+from collections import Counter
+
+from graph import StringTable
+
+# Trigrams shared by more names than this are skipped once rarer trigrams
+# have produced some candidates, since they barely narrow the search
+MAX_POSTINGS = 20000
+
+# Fuzzy matches less similar than this are not worth suggesting
+MIN_SIMILARITY = 0.2
+
+# Highest code point, used to find the end of a range of names sharing a prefix
+LAST_CHARACTER = "\U0010ffff"
+
+
+def trigrams(name):
+    """
+    Returns the set of three-character substrings of a lowercase name,
+    padded so that the start and end of the name count as well.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Index over the names of people, where each person is identified by
+    their position in the sequence of names the index was built from.
+
+    The lowercase names are kept sorted, so exact and prefix lookups are
+    binary searches. Fuzzy lookups use a trigram index that is built the
+    first time it is needed, at most once even when several threads (such
+    as the server's) need it at the same time.
+    """
+
+    def __init__(self, names, order=None, keys=None):
+        """
+        Indexes names, a sequence of strings such as a StringTable. The
+        order and keys of an index over the same names, such as one read
+        from a snapshot, can be passed in to skip sorting them again.
+        """
+        if order is None:
+            # Only the sort keys are held at once, rather than a separate
+            # list of every lowercase name as well
+            order = array("i", sorted(range(len(names)), key=lambda person: names[person].lower()))
+            keys = StringTable.from_strings(names[person].lower() for person in order)
+
+        # order[i] is the person with the i-th name in sorted order, and
+        # keys[i] is that name in lowercase
+        self.order = order
+        self.keys = keys
+
+        # (postings, trigramCounts), built lazily by build_trigrams and
+        # published as one tuple so no thread sees only half of it
+        self.trigramIndex = None
+        self.trigramLock = threading.Lock()
+
+    def exact(self, name):
+        """
+        Returns the people with a given name, ignoring case.
+        """
+        start, end = self.name_range(name.lower())
+        return list(self.order[start:end])
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit people whose names start with prefix,
+        ignoring case, in alphabetical order.
+        """
+        start, end = self.prefix_range(prefix.lower())
+        return list(self.order[start:min(end, start + limit)])
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to limit (score, person) pairs for the people whose names
+        share the most trigrams with the given name, best match first.
+        The score is the Jaccard similarity of the two sets of trigrams.
+        """
+        trigramIndex = self.trigramIndex
+        if trigramIndex is None:
+            trigramIndex = self.build_trigrams()
+        postingsByTrigram, trigramCounts = trigramIndex
+
+        query = trigrams(name.lower())
+        postings = sorted((postingsByTrigram.get(trigram, ()) for trigram in query), key=len)
+
+        # Count shared trigrams for each distinct name, rarest trigrams first
+        shared = Counter()
+        for posting in postings:
+            if len(posting) > MAX_POSTINGS and shared:
+                break
+            shared.update(posting)
+
+        def score(item):
+            position, count = item
+            return count / (len(query) + trigramCounts[position] - count)
+
+        matches = []
+        for position, count in heapq.nlargest(limit, shared.items(), key=score):
+            similarity = score((position, count))
+            start, end = self.name_range(self.keys[position], lo=position)
+            matches.extend((similarity, person) for person in self.order[start:end])
+        return matches[:limit]
+
+    def suggest(self, name, limit=10):
+        """
+        Returns up to limit (score, person) pairs for people the given name
+        may refer to, best first: exact matches score 1, names it is a
+        prefix of score by how much of the name it covers, and other
+        names score by trigram similarity. A blank name suggests no one,
+        rather than every name it is a prefix of.
+        """
+        if not name.strip():
+            return []
+        suggestions = [(1.0, person) for person in self.exact(name)]
+        seen = {person for _, person in suggestions}
+        start, end = self.prefix_range(name.lower())
+        for position in range(start, min(end, start + limit)):
+            person = self.order[position]
+            if person not in seen:
+                suggestions.append((len(name) / len(self.keys[position]), person))
+                seen.add(person)
+        for similarity, person in self.fuzzy(name, limit):
+            if similarity >= MIN_SIMILARITY and person not in seen:
+                suggestions.append((similarity, person))
+                seen.add(person)
+        suggestions.sort(key=lambda suggestion: suggestion[0], reverse=True)
+        return suggestions[:limit]
+
+    def name_range(self, key, lo=0):
+        """
+        Returns the (start, end) range of sorted positions holding key.
+        """
+        start = bisect.bisect_left(self.keys, key, lo=lo)
+        end = bisect.bisect_right(self.keys, key, lo=start)
+        return start, end
+
+    def prefix_range(self, prefix):
+        """
+        Returns the (start, end) range of sorted positions whose names
+        start with prefix.
+        """
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + LAST_CHARACTER, lo=start)
+        return start, end
+
+    def build_trigrams(self):
+        """
+        Builds the trigram index unless another thread already has, and
+        returns it as (postings, trigramCounts): postings maps each trigram
+        to the sorted positions of the distinct names containing it, and
+        trigramCounts holds the number of trigrams of the name at each.
+        """
+        with self.trigramLock:
+            if self.trigramIndex is None:
+                self.trigramIndex = self.index_trigrams()
+            return self.trigramIndex
+
+    def index_trigrams(self):
+        postings = {}
+        trigramCounts = array("H", [0]) * len(self.keys)
+        previous = None
+        for position, key in enumerate(self.keys):
+            if key == previous:
+                continue
+            previous = key
+            keyTrigrams = trigrams(key)
+            trigramCounts[position] = min(len(keyTrigrams), 0xFFFF)
+            for trigram in keyTrigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    posting = postings[trigram] = array("i")
+                posting.append(position)
+        return postings, trigramCounts
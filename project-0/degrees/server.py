@@ -0,0 +1,65 @@
+# Local HTTP server for degrees.py
+# Keeps the loaded graph resident so that each query only pays for
+# the search, answering several clients at once on separate threads
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HOST = "127.0.0.1"
+
+
+def serve(answer, suggest, port, log=None):
+    """
+    Serves GET /path?source=NAME&target=NAME[&search=STRATEGY] on localhost,
+    responding with the JSON returned by answer(source, target, search),
+    and GET /names?q=NAME[&limit=N] with the JSON list from suggest(name, limit).
+    """
+
+    class QueryHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/names":
+                self.answer_names(query)
+            elif url.path != "/path":
+                self.send_json(404, {"error": f"unknown path '{url.path}'"})
+            elif "source" not in query or "target" not in query:
+                self.send_json(400, {"error": "source and target are required"})
+            else:
+                search = query.get("search", ["bfs"])[0]
+                self.send_json(200, answer(query["source"][0], query["target"][0], search))
+
+        def answer_names(self, query):
+            if "q" not in query:
+                self.send_json(400, {"error": "q is required"})
+                return
+            try:
+                limit = int(query.get("limit", ["10"])[0])
+            except ValueError:
+                self.send_json(400, {"error": "limit must be an integer"})
+                return
+            self.send_json(200, suggest(query["q"][0], limit))
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            if log is not None:
+                print(f"{self.address_string()} - {format % args}", file=log)
+
+    server = ThreadingHTTPServer((HOST, port), QueryHandler)
+    if log is not None:
+        print(f"Serving on http://{HOST}:{server.server_address[1]}/path", file=log)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,181 @@
+# Binary snapshot of a loaded degrees graph
+# Parsing the CSV files is far slower than answering a query, so the
+# graph is saved next to the CSVs and memory-mapped on later runs
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph, IdIndex, StringTable
+from nameindex import NameIndex
+
+SNAPSHOT_NAME = "degrees.snapshot"
+MAGIC = b"DEGREES\0"
+VERSION = 3
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Magic, version, byte order, then (mtime_ns, size) for each source CSV
+HEADER = struct.Struct(f"<8sIc3x{2 * len(SOURCES)}q")
+SECTION = struct.Struct("<q")
+ALIGNMENT = 8
+
+# Array type code of each section: the offsets and blob of the six string
+# tables, the CSR arrays of people and movies, the person and movie
+# indexes in order of their ids, for looking ids up by binary search, and
+# the people in order of their names with the lowercase names in that order
+SECTION_TYPES = ["q", "B"] * 6 + ["i"] * 6 + ["i", "q", "B"]
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def source_stamps(directory):
+    """
+    Returns the (mtime_ns, size) of each source CSV, flattened into one list.
+    """
+    stamps = []
+    for source in SOURCES:
+        stat = os.stat(os.path.join(directory, source))
+        stamps.extend([stat.st_mtime_ns, stat.st_size])
+    return stamps
+
+
+def header(stamps):
+    byteorder = b"<" if sys.byteorder == "little" else b">"
+    return HEADER.pack(MAGIC, VERSION, byteorder, *stamps)
+
+
+def write_snapshot(directory, graph, stamps=None):
+    """
+    Writes the graph to a snapshot next to the CSVs in directory,
+    stamped with their modification times and sizes.
+
+    stamps should be the source_stamps taken before the CSVs were read,
+    so that a CSV replaced while it was being parsed leaves the snapshot
+    out of date instead of labelling old data with the new stamps.
+    """
+    if stamps is None:
+        stamps = source_stamps(directory)
+    sections = []
+    for table in [graph.personIds, graph.names, graph.births,
+                  graph.movieIds, graph.titles, graph.years]:
+        sections.extend([table.offsets, table.blob])
+    sections.extend([graph.personOffsets, graph.movieOf, graph.movieOffsets, graph.starOf])
+    for ids, index in [(graph.personIds, graph.personIndex), (graph.movieIds, graph.movieIndex)]:
+        if not isinstance(index, IdIndex):
+            index = IdIndex.from_table(ids)
+        sections.append(index.order)
+    nameIndex = graph.nameIndex
+    if nameIndex is None:
+        nameIndex = NameIndex(graph.names)
+    sections.extend([nameIndex.order, nameIndex.keys.offsets, nameIndex.keys.blob])
+
+    # Write to a temporary file first so a half-written snapshot is never read
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(header(stamps))
+            for section in sections:
+                data = memoryview(section).cast("B")
+                f.write(SECTION.pack(len(data)))
+                f.write(data)
+                f.write(bytes(-len(data) % ALIGNMENT))
+        os.replace(temporary, path)
+    except OSError:
+        # Don't leave a partial file behind, such as when the disk is full
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(directory):
+    """
+    Memory-maps the snapshot in directory and returns its graph, or None
+    if there is no snapshot, it is out of date with the CSVs, or it is
+    truncated or otherwise not laid out as write_snapshot writes it.
+    """
+    path = snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    bounds = section_bounds(buffer, directory)
+    if bounds is None:
+        buffer.close()
+        return None
+
+    view = memoryview(buffer)
+    sections = [
+        view[start:start + length].cast(typecode)
+        for (start, length), typecode in zip(bounds, SECTION_TYPES)
+    ]
+    tables = [StringTable(sections[i], sections[i + 1]) for i in range(0, 12, 2)]
+    return Graph(*tables, *sections[12:16],
+                 personIndex=IdIndex(tables[0], sections[16]),
+                 movieIndex=IdIndex(tables[3], sections[17]),
+                 nameIndex=NameIndex(tables[1], sections[18], StringTable(sections[19], sections[20])))
+
+
+def section_bounds(buffer, directory):
+    """
+    Returns the (start, length) in bytes of each section of a snapshot,
+    or None if its header does not match the CSVs in directory or its
+    sections do not fit the file and each other.
+    """
+    size = len(buffer)
+    if size < HEADER.size or buffer[:HEADER.size] != header(source_stamps(directory)):
+        return None
+
+    # Every section is a length followed by that many bytes, padded for alignment
+    bounds = []
+    position = HEADER.size
+    while position < size:
+        if position + SECTION.size > size:
+            return None
+        length, = SECTION.unpack_from(buffer, position)
+        position += SECTION.size
+        if length < 0 or position + length > size:
+            return None
+        bounds.append((position, length))
+        position += length + (-length % ALIGNMENT)
+    if position != size or len(bounds) != len(SECTION_TYPES):
+        return None
+
+    counts = []
+    for (start, length), typecode in zip(bounds, SECTION_TYPES):
+        if length % array(typecode).itemsize:
+            return None
+        counts.append(length // array(typecode).itemsize)
+
+    def last(section):
+        """Returns the last value of an offsets section."""
+        (start, length), typecode = bounds[section], SECTION_TYPES[section]
+        return struct.unpack_from(typecode, buffer, start + length - array(typecode).itemsize)[0]
+
+    # Each string table ends where its blob does, the three tables of people
+    # and of movies are as long as each other, and the CSR offsets have one
+    # more entry than there are people or movies and end with their arrays
+    for i in range(0, 12, 2):
+        if counts[i] == 0 or last(i) != counts[i + 1]:
+            return None
+    numPeople, numMovies = counts[0] - 1, counts[6] - 1
+    if counts[2] != numPeople + 1 or counts[4] != numPeople + 1 \
+            or counts[8] != numMovies + 1 or counts[10] != numMovies + 1:
+        return None
+    if counts[12] != numPeople + 1 or counts[14] != numMovies + 1 \
+            or last(12) != counts[13] or last(14) != counts[15]:
+        return None
+    if counts[16] != numPeople or counts[17] != numMovies:
+        return None
+    # The name index orders every person and has a lowercase name for each
+    if counts[18] != numPeople or counts[19] != numPeople + 1 or last(19) != counts[20]:
+        return None
+    return bounds
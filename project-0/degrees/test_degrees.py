@@ -0,0 +1,40 @@
+import os
+import threading
+
+import degrees
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+def test_tree_stats_under_threads():
+    degrees.load_data(SMALL, useSnapshot=False)
+    person_ids = sorted(degrees.graph.personIds)
+    expected = {
+        source: degrees.graph.bfs_tree(degrees.graph.personIndex[source]).explored
+        for source in person_ids
+    }
+    degrees.bfs_tree.cache_clear()
+
+    results = []
+    lock = threading.Lock()
+
+    def query(offset):
+        for i in range(50):
+            source = person_ids[(offset + i) % len(person_ids)]
+            stats = {}
+            degrees.tree_shortest_path(source, person_ids[0], stats)
+            with lock:
+                results.append((source, stats["explored"]))
+
+    threads = [threading.Thread(target=query, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each query reports the whole tree when it computed it and nothing
+    # when another query had, so the computed trees are the cache misses
+    for source, explored in results:
+        assert explored in (0, expected[source])
+    computed = sum(1 for _, explored in results if explored)
+    assert computed == degrees.bfs_tree.cache_info().misses
@@ -0,0 +1,69 @@
+import random
+
+from graph import Graph
+
+
+def build_graph(edges):
+    """
+    Returns a graph with one movie per edge, starring the two people it joins,
+    and a dict from person ids to indexes.
+    """
+    people = {}
+    movies = {}
+    for i, (first, second) in enumerate(edges):
+        movie_id = str(i)
+        movies[movie_id] = {"title": f"{first}-{second}", "year": "", "stars": {first, second}}
+        for person_id in (first, second):
+            people.setdefault(person_id, {"name": person_id, "birth": "", "movies": set()})
+            people[person_id]["movies"].add(movie_id)
+    graph = Graph.from_data(people, movies)
+    index = {graph.personIds[i]: i for i in range(graph.num_people())}
+    return graph, index
+
+
+def simple_paths(graph, source, target):
+    """Returns every path from source to target that never revisits a person."""
+    paths = []
+
+    def extend(person, path, visited):
+        if person == target:
+            paths.append(list(path))
+            return
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor not in visited:
+                path.append((movie, neighbor))
+                visited.add(neighbor)
+                extend(neighbor, path, visited)
+                visited.discard(neighbor)
+                path.pop()
+
+    extend(source, [], {source})
+    return paths
+
+
+def test_k_shortest_paths_deviates_from_every_shortest_path():
+    graph, index = build_graph([
+        ("s", "a"), ("a", "x"), ("x", "t"), ("s", "b"), ("b", "y"), ("y", "t"),
+        ("a", "u"), ("u", "v"), ("v", "t")
+    ])
+    paths = list(graph.k_shortest_paths(index["s"], index["t"], 5))
+    names = [[graph.personIds[person] for _, person in path] for path in paths]
+    assert sorted(names[:2]) == [["a", "x", "t"], ["b", "y", "t"]]
+    assert names[2:] == [["a", "u", "v", "t"]]
+
+
+def test_k_shortest_paths_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(50):
+        people = [str(i) for i in range(8)]
+        edges = [tuple(rng.sample(people, 2)) for _ in range(12)]
+        graph, index = build_graph(edges)
+        source, target = index[edges[0][0]], index[edges[-1][1]]
+        if source == target:
+            continue
+
+        expected = sorted(len(path) for path in simple_paths(graph, source, target))
+        for k in (1, 3, 10):
+            paths = list(graph.k_shortest_paths(source, target, k))
+            assert [len(path) for path in paths] == expected[:k]
+            assert len({tuple(path) for path in paths}) == len(paths)
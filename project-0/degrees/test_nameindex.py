@@ -0,0 +1,45 @@
+import threading
+import time
+
+from nameindex import NameIndex
+
+NAMES = ["Kevin Bacon", "Tom Hanks", "Tom Cruise", "Sally Field", "Kevin Costner", "Tom Hanks"]
+
+
+def test_fuzzy_matches():
+    index = NameIndex(NAMES)
+    assert [person for _, person in index.fuzzy("tom hank", 2)] == [1, 5]
+    assert index.fuzzy("kevn bacon", 1)[0][1] == 0
+
+
+def test_blank_names_suggest_no_one():
+    index = NameIndex(NAMES)
+    for name in ["", " ", "\t"]:
+        assert index.suggest(name) == []
+
+
+def test_trigrams_are_built_once_across_threads():
+    index = NameIndex(NAMES)
+    builds = []
+    indexTrigrams = index.index_trigrams
+
+    def slowIndexTrigrams():
+        # Give every thread time to ask for the index while it is being built
+        builds.append(None)
+        time.sleep(0.05)
+        return indexTrigrams()
+
+    index.index_trigrams = slowIndexTrigrams
+    results = [None] * 8
+
+    def lookup(i):
+        results[i] = index.fuzzy("tom hanks", 3)
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(result == results[0] for result in results)
+    assert results[0][0] == (1.0, 1)
@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pytest
+
+import degrees
+import snapshot
+from graph import IdIndex
+from nameindex import NameIndex
+from snapshot import read_snapshot, snapshot_path, write_snapshot
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for source in snapshot.SOURCES:
+        shutil.copy(os.path.join(SMALL, source), tmp_path)
+    degrees.load_data(str(tmp_path))
+    return str(tmp_path)
+
+
+def answer(directory, **options):
+    degrees.load_data(directory, **options)
+    return degrees.answer_query("Kevin Bacon", "Tom Hanks")
+
+
+def test_snapshot_round_trip(directory):
+    graph = read_snapshot(directory)
+    assert graph is not None
+    assert list(graph.personIds) == list(degrees.graph.personIds)
+    assert list(graph.names) == list(degrees.graph.names)
+    assert list(graph.starOf) == list(degrees.graph.starOf)
+
+    # The name index is read back rather than sorted again
+    fresh = NameIndex(list(graph.names))
+    assert isinstance(graph.nameIndex.order, memoryview)
+    assert list(graph.nameIndex.order) == list(fresh.order)
+    assert list(graph.nameIndex.keys) == list(fresh.keys)
+    assert graph.nameIndex.suggest("tom hank") == fresh.suggest("tom hank")
+
+
+def test_snapshot_is_not_decoded_into_dicts(directory):
+    expected = answer(directory, useSnapshot=False)
+    assert degrees.people
+
+    assert answer(directory) == expected
+    assert not degrees.people and not degrees.movies and not degrees.names
+    assert isinstance(degrees.graph.personIndex, IdIndex)
+    for i, person_id in enumerate(degrees.graph.personIds):
+        assert degrees.graph.personIndex[person_id] == i
+    for i, movie_id in enumerate(degrees.graph.movieIds):
+        assert degrees.graph.movieIndex[movie_id] == i
+    assert "0" not in degrees.graph.personIndex
+    assert degrees.graph.movieIndex.get("") is None
+
+
+def test_truncated_snapshot_is_ignored(directory):
+    path = snapshot_path(directory)
+    with open(path, "rb") as f:
+        data = f.read()
+    expected = answer(directory, useSnapshot=False)
+
+    for size in range(0, len(data), 5):
+        with open(path, "wb") as f:
+            f.write(data[:size])
+        assert read_snapshot(directory) is None
+
+        # Loading falls back to the CSV files and rewrites the snapshot
+        assert answer(directory) == expected
+        assert read_snapshot(directory) is not None
+
+
+def test_corrupt_snapshot_is_ignored(directory):
+    path = snapshot_path(directory)
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    for position in [0, snapshot.HEADER.size]:
+        corrupt = bytearray(data)
+        corrupt[position] ^= 0xFF
+        with open(path, "wb") as f:
+            f.write(corrupt)
+        assert read_snapshot(directory) is None
+
+
+def test_csv_changed_while_parsing_outdates_snapshot(directory, monkeypatch):
+    os.remove(snapshot_path(directory))
+    load_csv_data = degrees.load_csv_data
+
+    def edit_while_parsing(csv_directory):
+        load_csv_data(csv_directory)
+        with open(os.path.join(csv_directory, "people.csv"), "a", encoding="utf-8") as f:
+            f.write('999999,"Late Addition",2000\n')
+
+    monkeypatch.setattr(degrees, "load_csv_data", edit_while_parsing)
+    degrees.load_data(directory)
+    assert os.path.exists(snapshot_path(directory))
+    assert read_snapshot(directory) is None
+
+
+def test_failed_write_leaves_no_temporary_file(directory, monkeypatch):
+    def replace(source, destination):
+        raise OSError("disk full")
+
+    os.remove(snapshot_path(directory))
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(OSError):
+        write_snapshot(directory, degrees.graph)
+    assert sorted(os.listdir(directory)) == sorted(snapshot.SOURCES)
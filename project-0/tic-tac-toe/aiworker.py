@@ -0,0 +1,82 @@
+# Background worker for the tic-tac-toe AI
+# Runs the search on its own thread so the window keeps responding while
+# the computer thinks, and lets a search in progress be cancelled
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tictactoe as ttt
+
+
+class AIWorker():
+    """
+    Computes AI moves one at a time on a background thread. The game loop
+    starts a search with start and calls poll every frame until the move
+    is ready.
+    """
+
+    def __init__(self, search):
+        self.search = search
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.startTime = None
+        self.startNodes = 0
+
+    def run(self, board):
+        # Only one search runs at a time, so any cancelled search has
+        # stopped by the time this one starts
+        ttt.cancelled.clear()
+        return self.search(board)
+
+    def start(self, board):
+        """
+        Starts searching for a move on the board, cancelling any search
+        already in progress.
+        """
+        self.cancel()
+        self.startTime = time.perf_counter()
+        self.startNodes = ttt.stats["nodes"]
+        self.future = self.executor.submit(self.run, board)
+
+    def busy(self):
+        return self.future is not None
+
+    def poll(self):
+        """
+        Returns the move once the search has finished, or None while it is
+        still running. Errors raised by the search are raised here.
+        """
+        if self.future is None or not self.future.done():
+            return None
+        future = self.future
+        self.future = None
+        return future.result()
+
+    def elapsed(self):
+        if self.startTime is None:
+            return 0.0
+        return time.perf_counter() - self.startTime
+
+    def nodesPerSecond(self):
+        """
+        Returns the rate at which the current search is visiting board states.
+        """
+        elapsed = self.elapsed()
+        if self.future is None or elapsed == 0:
+            return 0.0
+        return (ttt.stats["nodes"] - self.startNodes) / elapsed
+
+    def cancel(self):
+        """
+        Stops the current search, if any, and discards its move.
+        """
+        if self.future is None:
+            return
+        if not self.future.cancel():
+            ttt.cancelled.set()
+        self.future = None
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=True)
+
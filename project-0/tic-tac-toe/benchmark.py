@@ -0,0 +1,98 @@
+# Benchmarks for tictactoe.py
+# Searches every reachable position with each search function and
+# compares how many board states they visit
+
+import argparse
+import time
+
+import bitboard
+import tictactoe as ttt
+from transposition import TranspositionTable
+
+
+def reachablePositions():
+    """
+    Returns every non-terminal board reachable from the initial state.
+    """
+    positions = []
+    seen = set()
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key = boardKey(board)
+        if key in seen or ttt.terminal(board):
+            continue
+        seen.add(key)
+        positions.append(board)
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return positions
+
+
+def boardKey(board):
+    return tuple(tuple(row) for row in board)
+
+
+def exactValue(board, values):
+    """
+    Returns the minimax value of a board, memoized in values.
+    """
+    key = boardKey(board)
+    if key not in values:
+        if ttt.terminal(board):
+            values[key] = ttt.utility(board)
+        else:
+            childValues = [exactValue(ttt.result(board, action), values) for action in ttt.actions(board)]
+            values[key] = max(childValues) if ttt.player(board) == ttt.X else min(childValues)
+    return values[key]
+
+
+def benchmarkSearches(searches, positions):
+    """
+    Runs each search from every position, checking that each chosen
+    action keeps the position's minimax value.
+    """
+    values = {}
+    expected = [exactValue(board, values) for board in positions]
+
+    for name, search, stats in searches:
+        stats["nodes"] = 0
+        start = time.perf_counter()
+        for board, value in zip(positions, expected):
+            action = search(board)
+            if exactValue(ttt.result(board, action), values) != value:
+                raise AssertionError(f"{name} chose a worse action {action} on {board}")
+        elapsed = time.perf_counter() - start
+        print(f"{name:>18}: {stats['nodes']:>10} nodes, {elapsed:8.3f}s "
+              f"for {len(positions)} positions")
+
+
+def main():
+    """
+    Benchmarks the searches. The opening book entry only reflects a lookup
+    when book.bin has been written by openingbook.py.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark tictactoe.py.")
+    parser.add_argument("--skip-plain", dest="plain", action="store_false",
+                        help="leave out plain minimax, which takes the longest")
+    args = parser.parse_args()
+
+    positions = reachablePositions()
+
+    # Each table is shared by every search of its engine, as between moves of a game
+    plainTable = TranspositionTable()
+    alphaBetaTable = TranspositionTable()
+    searches = [
+        ("alpha-beta", ttt.alphaBetaSearch, ttt.stats),
+        ("minimax + table", lambda board: ttt.plainSearch(board, plainTable), ttt.stats),
+        ("alpha-beta + table", lambda board: ttt.alphaBetaSearch(board, alphaBetaTable), ttt.stats),
+        ("bitboard", bitboard.minimax, bitboard.stats),
+        ("opening book", ttt.minimax, ttt.stats)
+    ]
+    if args.plain:
+        searches.insert(0, ("minimax", ttt.plainSearch, ttt.stats))
+    benchmarkSearches(searches, positions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Bitboard engine for the tic-tac-toe AI
+# A board is two 9-bit integers, one per player, where bit 3 * i + j is
+# set when that player occupies square (i, j). Boards are converted from
+# and to tictactoe's list-of-lists representation only at the boundary.
+
+import tictactoe as ttt
+
+FULL = 0b111111111
+
+# The 8 lines of three squares that win the game
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100               # diagonals
+]
+
+# IS_WIN[mask] is 1 if the squares in mask contain a whole line, so
+# checking a player for a win is a single lookup
+IS_WIN = bytes(
+    int(any(mask & line == line for line in WIN_MASKS))
+    for mask in range(FULL + 1)
+)
+
+# Squares in the order the search tries them: center, corners, edges
+MOVE_ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+# Counts the board states visited by the search
+stats = {"nodes": 0}
+
+
+def fromBoard(board):
+    """
+    Returns the (x, o) bitmasks of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(ttt.BOARD_LENGTH):
+        for j in range(ttt.BOARD_WIDTH):
+            if board[i][j] == ttt.X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == ttt.O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def toBoard(x, o):
+    """
+    Returns the list-of-lists board for a pair of bitmasks.
+    """
+    board = ttt.initial_state()
+    for square in range(9):
+        if x >> square & 1:
+            board[square // 3][square % 3] = ttt.X
+        elif o >> square & 1:
+            board[square // 3][square % 3] = ttt.O
+    return board
+
+
+def value(mover, other, alpha, beta):
+    """
+    Returns the value of the position for the player about to move, whose
+    squares are mover, as 1 for a win, -1 for a loss and 0 for a draw,
+    searching with alpha-beta pruning in negamax form.
+    """
+    stats["nodes"] += 1
+
+    # Only the player who just moved can have completed a line
+    if IS_WIN[other]:
+        return -1
+    occupied = mover | other
+    if occupied == FULL:
+        return 0
+
+    best = -1
+    for square in MOVE_ORDER:
+        bit = 1 << square
+        if occupied & bit:
+            continue
+        v = -value(other, mover | bit, -beta, -alpha)
+        if v > best:
+            best = v
+            if v > alpha:
+                alpha = v
+                if alpha >= beta:
+                    break
+    return best
+
+
+def bestSquare(x, o):
+    """
+    Returns the best square for the player to move, or None if the game is over.
+    """
+    if IS_WIN[x] or IS_WIN[o] or x | o == FULL:
+        return None
+
+    # X moves whenever both players have played the same number of squares
+    if bin(x).count("1") == bin(o).count("1"):
+        mover, other = x, o
+    else:
+        mover, other = o, x
+
+    optimalSquare = None
+    alpha = -2
+    for square in MOVE_ORDER:
+        bit = 1 << square
+        if (mover | other) & bit:
+            continue
+        v = -value(other, mover | bit, -1, -alpha)
+        if v > alpha:
+            alpha = v
+            optimalSquare = square
+            if alpha == 1:
+                break
+    return optimalSquare
+
+
+def minimax(board):
+    """
+    Returns the optimal action (i, j) for the current player on a
+    list-of-lists board, as a drop-in replacement for tictactoe.minimax.
+    """
+    square = bestSquare(*fromBoard(board))
+    if square is None:
+        return None
+    return (square // 3, square % 3)
@@ -0,0 +1,296 @@
+# Generalized m,n,k-game engine
+# Plays tic-tac-toe on an m-row by n-column board where k in a row wins,
+# using iterative deepening alpha-beta search with a heuristic evaluation
+# so that boards too large to search completely still get a move in time
+
+import argparse
+import time
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+# Value of a won position. Wins found sooner score higher, so the search
+# prefers the quickest win and the slowest loss.
+WIN = 1000000
+
+# Heuristic values are clamped to this, well below WIN minus the number of
+# squares on any board, so an unfinished position never looks like a win
+MAX_HEURISTIC = WIN // 2
+
+# How often, in nodes, the search checks whether it has run out of time
+TIME_CHECK_INTERVAL = 1024
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget for a move runs out.
+    """
+
+
+def winLines(m, n, k):
+    """
+    Returns every line of k squares on an m by n board, as tuples of
+    flat square indexes i * n + j.
+    """
+    lines = []
+    directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    for i in range(m):
+        for j in range(n):
+            for di, dj in directions:
+                endI = i + (k - 1) * di
+                endJ = j + (k - 1) * dj
+                if 0 <= endI < m and 0 <= endJ < n:
+                    lines.append(tuple((i + step * di) * n + (j + step * dj) for step in range(k)))
+    return lines
+
+
+class MNKGame():
+    """
+    An m,n,k-game: boards are m rows of n squares, and the first player
+    to get k of their marks in a row, column or diagonal wins.
+    """
+
+    def __init__(self, m, n, k):
+        self.m = m
+        self.n = n
+        self.k = k
+        self.lines = winLines(m, n, k)
+
+        # linesThrough[s] holds the lines that pass through square s, so a
+        # move only has to be checked against the lines it could complete
+        self.linesThrough = [[] for _ in range(m * n)]
+        for line in self.lines:
+            for square in line:
+                self.linesThrough[square].append(line)
+
+        # Squares nearer the center are part of more lines, so try them first
+        centerI = (m - 1) / 2
+        centerJ = (n - 1) / 2
+        self.moveOrder = sorted(
+            range(m * n),
+            key=lambda square: abs(square // n - centerI) + abs(square % n - centerJ)
+        )
+
+        # Statistics for each depth of the most recent search
+        self.depthStats = []
+        self.nodes = 0
+        self.deadline = None
+
+    def initial_state(self):
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        marks = sum(square is not EMPTY for row in board for square in row)
+        return X if marks % 2 == 0 else O
+
+    def actions(self, board):
+        return {(i, j) for i in range(self.m) for j in range(self.n) if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] != EMPTY:
+            raise UserWarning("Invalid move")
+        newBoard = [row[:] for row in board]
+        newBoard[i][j] = self.player(board)
+        return newBoard
+
+    def winner(self, board):
+        cells = self.flatten(board)
+        for line in self.lines:
+            mark = cells[line[0]]
+            if mark is not EMPTY and all(cells[square] == mark for square in line):
+                return mark
+        return None
+
+    def terminal(self, board):
+        return self.winner(board) is not None or all(
+            square is not EMPTY for row in board for square in row
+        )
+
+    def flatten(self, board):
+        return [square for row in board for square in row]
+
+    def completesLine(self, cells, square):
+        """
+        Returns True if the mark on square completes one of its lines.
+        """
+        mark = cells[square]
+        for line in self.linesThrough[square]:
+            if all(cells[other] == mark for other in line):
+                return True
+        return False
+
+    def evaluate(self, cells, mover):
+        """
+        Returns a heuristic value of a position for the player to move. Each
+        line still open to only one player is worth more the more of their
+        marks it holds.
+        """
+        score = 0
+        for line in self.lines:
+            xCount = 0
+            oCount = 0
+            for square in line:
+                if cells[square] == X:
+                    xCount += 1
+                elif cells[square] == O:
+                    oCount += 1
+            if oCount == 0 and xCount:
+                score += 4 ** xCount
+            elif xCount == 0 and oCount:
+                score -= 4 ** oCount
+        score = max(-MAX_HEURISTIC, min(MAX_HEURISTIC, score))
+        return score if mover == X else -score
+
+    def negamax(self, cells, depth, alpha, beta, mover, ply, lastSquare, empties):
+        """
+        Returns the value of a position for the player to move, searching
+        depth more moves with alpha-beta pruning before evaluating it.
+        """
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        # Only the player who just moved can have won
+        if lastSquare is not None and self.completesLine(cells, lastSquare):
+            return -(WIN - ply)
+        if empties == 0:
+            return 0
+        if depth == 0:
+            return self.evaluate(cells, mover)
+
+        opponent = O if mover == X else X
+        best = -WIN - 1
+        for square in self.moveOrder:
+            if cells[square] is not EMPTY:
+                continue
+            cells[square] = mover
+            try:
+                value = -self.negamax(cells, depth - 1, -beta, -alpha, opponent, ply + 1, square, empties - 1)
+            finally:
+                # Undo the move even when the search times out
+                cells[square] = EMPTY
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return best
+
+    def searchDepth(self, cells, depth, mover, firstSquare):
+        """
+        Returns (value, square) for the best move found searching to depth,
+        trying firstSquare (the best move of the previous depth) first.
+        """
+        opponent = O if mover == X else X
+        empties = cells.count(EMPTY)
+        order = [square for square in self.moveOrder if cells[square] is EMPTY]
+        if firstSquare in order:
+            order.remove(firstSquare)
+            order.insert(0, firstSquare)
+
+        alpha = -WIN - 1
+        bestSquare = order[0]
+        for square in order:
+            cells[square] = mover
+            try:
+                value = -self.negamax(cells, depth - 1, -WIN - 1, -alpha, opponent, 1, square, empties - 1)
+            finally:
+                cells[square] = EMPTY
+            if value > alpha:
+                alpha = value
+                bestSquare = square
+        return alpha, bestSquare
+
+    def search(self, board, timeLimit=1.0, maxDepth=None):
+        """
+        Returns the best action (i, j) found for the current player within
+        roughly timeLimit seconds, or None if the game is over.
+
+        Searches one move deeper each iteration, keeping the move from the
+        deepest completed iteration. Per-depth statistics are left in
+        depthStats as dicts of depth, nodes, seconds, value, action and
+        whether the depth completed.
+        """
+        if self.terminal(board):
+            return None
+
+        cells = self.flatten(board)
+        mover = self.player(board)
+        empties = cells.count(EMPTY)
+        maxDepth = empties if maxDepth is None else min(maxDepth, empties)
+
+        self.depthStats = []
+        self.deadline = time.perf_counter() + timeLimit
+        bestSquare = None
+        for depth in range(1, maxDepth + 1):
+            self.nodes = 0
+            start = time.perf_counter()
+            try:
+                value, square = self.searchDepth(cells, depth, mover, bestSquare)
+            except SearchTimeout:
+                self.depthStats.append({
+                    "depth": depth, "nodes": self.nodes,
+                    "seconds": time.perf_counter() - start,
+                    "value": None, "action": None, "completed": False
+                })
+                break
+
+            bestSquare = square
+            self.depthStats.append({
+                "depth": depth, "nodes": self.nodes,
+                "seconds": time.perf_counter() - start,
+                "value": value, "action": divmod(square, self.n), "completed": True
+            })
+
+            # A forced win or loss has been found, so searching deeper cannot help
+            if abs(value) >= WIN - empties:
+                break
+
+        # If not even depth 1 finished, play the most central free square
+        if bestSquare is None:
+            bestSquare = next(square for square in self.moveOrder if cells[square] is EMPTY)
+        return divmod(bestSquare, self.n)
+
+
+def main():
+    """
+    Plays the engine against itself and prints per-depth statistics for each move.
+    """
+    parser = argparse.ArgumentParser(description="Self-play an m,n,k-game.")
+    parser.add_argument("m", type=int, help="number of rows")
+    parser.add_argument("n", type=int, help="number of columns")
+    parser.add_argument("k", type=int, help="marks in a row needed to win")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds per move")
+    args = parser.parse_args()
+
+    game = MNKGame(args.m, args.n, args.k)
+    board = game.initial_state()
+    while not game.terminal(board):
+        currentPlayer = game.player(board)
+        action = game.search(board, args.time)
+        board = game.result(board, action)
+        print(f"{currentPlayer} plays {action}")
+        for stat in game.depthStats:
+            status = "" if stat["completed"] else " (out of time)"
+            print(f"    depth {stat['depth']:>2}: {stat['nodes']:>8} nodes in "
+                  f"{stat['seconds']:.3f}s, value {stat['value']}{status}")
+
+    for row in board:
+        print(" ".join(square or "." for square in row))
+    winner = game.winner(board)
+    print("Tie." if winner is None else f"{winner} wins.")
+
+
+if __name__ == "__main__":
+    main()
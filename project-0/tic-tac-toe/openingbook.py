@@ -0,0 +1,142 @@
+# Perfect-play opening book for tic-tac-toe
+# Solves every reachable position once and saves the best move and value
+# of each, so the AI can answer any position with a single lookup
+
+import argparse
+import struct
+from array import array
+
+import tictactoe as ttt
+from transposition import canonicalize, writeFile
+
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+
+# Preference among equally good moves: center, then corners, then edges
+MOVE_ORDER = [i * 3 + j for i, j in ttt.MOVE_ORDER]
+
+
+def transform(board, symmetry):
+    """
+    Returns the board seen through a symmetry, whose square k is the
+    original board's square symmetry[k].
+    """
+    flat = [board[i][j] for i in range(3) for j in range(3)]
+    return [[flat[symmetry[3 * i + j]] for j in range(3)] for i in range(3)]
+
+
+def solve():
+    """
+    Returns a dict mapping the canonical key of every reachable non-terminal
+    position to (square, value): the best square to play on the canonical
+    board, numbered row by row, and the position's minimax value.
+    """
+    values = {}
+
+    def value(board):
+        key = canonicalize(board)[0]
+        if key not in values:
+            if ttt.terminal(board):
+                values[key] = ttt.utility(board)
+            else:
+                childValues = [value(ttt.result(board, action)) for action in ttt.actions(board)]
+                values[key] = max(childValues) if ttt.player(board) == ttt.X else min(childValues)
+        return values[key]
+
+    entries = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key, symmetry = canonicalize(board)
+        if key in entries or ttt.terminal(board):
+            continue
+
+        # Pick the preferred optimal move on the canonical board
+        canonicalBoard = transform(board, symmetry)
+        boardValue = value(canonicalBoard)
+        for square in MOVE_ORDER:
+            action = divmod(square, 3)
+            if canonicalBoard[action[0]][action[1]] == ttt.EMPTY and \
+                    value(ttt.result(canonicalBoard, action)) == boardValue:
+                entries[key] = (square, boardValue)
+                break
+
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+
+    return entries
+
+
+class OpeningBook():
+    """
+    Best move and value for every reachable tic-tac-toe position, keyed by
+    the canonical key of the position under rotations and reflections.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, board):
+        """
+        Returns (action, value) for the board, or None if the board is
+        terminal or not reachable in a legal game.
+        """
+        key, symmetry = canonicalize(board)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        square, value = entry
+
+        # The book's square is on the canonical board, which reads square k
+        # from the original board's square symmetry[k]
+        return divmod(symmetry[square], 3), value
+
+    def save(self, path):
+        """
+        Writes the book as sorted 16-bit keys followed by one byte per
+        entry packing the square (low 4 bits) and the value plus one.
+        """
+        keys = array("H", sorted(self.entries))
+        packed = array("B", (
+            self.entries[key][0] | (self.entries[key][1] + 1) << 4 for key in keys
+        ))
+        writeFile(path, [HEADER.pack(MAGIC, VERSION, len(keys)), keys.tobytes(), packed.tobytes()])
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns the book saved at path, or None if there is no valid book.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < HEADER.size:
+            return None
+        magic, version, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or len(data) != HEADER.size + 3 * count:
+            return None
+
+        keys = array("H")
+        keys.frombytes(data[HEADER.size:HEADER.size + 2 * count])
+        packed = data[HEADER.size + 2 * count:]
+        return cls({key: (byte & 0xF, (byte >> 4) - 1) for key, byte in zip(keys, packed)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve tic-tac-toe and write an opening book.")
+    parser.add_argument("path", nargs="?", default=ttt.BOOK_FILE)
+    args = parser.parse_args()
+
+    book = OpeningBook(solve())
+    book.save(args.path)
+    print(f"Saved {len(book)} positions to {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
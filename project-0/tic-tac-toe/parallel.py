@@ -0,0 +1,152 @@
+# Parallel root-split search for the tic-tac-toe AI
+# Searches each move from the root in its own worker process. Alpha-beta
+# workers share the best value found so far, so moves searched later start
+# with a tighter window and are cut off sooner.
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+
+import tictactoe as ttt
+
+# Best value found so far for the player to move at the root, shared by
+# every worker of a ParallelSearch
+bestValue = None
+
+
+def initWorker(shared):
+    global bestValue
+    bestValue = shared
+
+
+def searchAction(board, action, pruning):
+    """
+    Returns (action, value, exact, nodes) for one move from the root. The
+    value is a bound rather than exact when alpha-beta search found the
+    move to be no better than one already searched by another worker.
+    """
+    ttt.stats["nodes"] = 0
+    child = ttt.result(board, action)
+    maximizing = ttt.player(board) == ttt.X
+    if not pruning:
+        value = ttt.minValue(child) if maximizing else ttt.maxValue(child)
+        return action, value, True, ttt.stats["nodes"]
+
+    with bestValue.get_lock():
+        bound = bestValue.value
+    if maximizing:
+        value = ttt.alphaBetaMin(child, bound, math.inf, 1, {})
+        exact = value > bound
+    else:
+        value = ttt.alphaBetaMax(child, -math.inf, bound, 1, {})
+        exact = value < bound
+
+    # Only exact values can tighten the window of the other workers
+    if exact:
+        with bestValue.get_lock():
+            if maximizing:
+                bestValue.value = max(bestValue.value, value)
+            else:
+                bestValue.value = min(bestValue.value, value)
+    return action, value, exact, ttt.stats["nodes"]
+
+
+class ParallelSearch():
+    """
+    Pool of worker processes that search the moves from the root in
+    parallel. Use as a context manager, or call close when done.
+    """
+
+    def __init__(self, processes=None):
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        self.shared = context.Value("d", 0.0)
+        self.pool = context.Pool(processes, initializer=initWorker, initargs=(self.shared,))
+        self.nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def minimax(self, board, pruning=False):
+        """
+        Returns the optimal action for the current player on the board, or
+        None if the game is over. Leaves the total number of board states
+        the workers visited in nodes.
+        """
+        if ttt.terminal(board):
+            return None
+        maximizing = ttt.player(board) == ttt.X
+        with self.shared.get_lock():
+            self.shared.value = -math.inf if maximizing else math.inf
+
+        # Search the likely best moves first so they set the bound early
+        legal = ttt.actions(board)
+        tasks = [(board, action, pruning) for action in ttt.MOVE_ORDER if action in legal]
+        rank = {task[1]: index for index, task in enumerate(tasks)}
+
+        self.nodes = 0
+        optimalAction = None
+        optimalValue = None
+        for action, value, exact, nodes in self.pool.starmap(searchAction, tasks, chunksize=1):
+            self.nodes += nodes
+            if not exact:
+                continue
+            if not maximizing:
+                value = -value
+
+            # Break ties in favor of the earlier move in MOVE_ORDER
+            if optimalValue is None or value > optimalValue or \
+                    (value == optimalValue and rank[action] < rank[optimalAction]):
+                optimalValue = value
+                optimalAction = action
+        return optimalAction
+
+
+def main():
+    """
+    Times the search of a position in one process and with pools of
+    several sizes, reporting the speedup of each pool.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark parallel tic-tac-toe search.")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4],
+                        help="pool sizes to time")
+    parser.add_argument("--pruning", action="store_true",
+                        help="time alpha-beta search instead of plain minimax")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="searches to time for each configuration")
+    args = parser.parse_args()
+
+    board = ttt.initial_state()
+    search = ttt.alphaBetaSearch if args.pruning else ttt.plainSearch
+    print(f"{os.cpu_count()} CPUs available")
+
+    ttt.stats["nodes"] = 0
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        search(board)
+    serial = (time.perf_counter() - start) / args.repeat
+    print(f"{'serial':>12}: {serial:8.3f}s, {ttt.stats['nodes'] // args.repeat:>8} nodes")
+
+    for processes in args.processes:
+        with ParallelSearch(processes) as parallel:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                parallel.minimax(board, args.pruning)
+            elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{processes:>2} processes: {elapsed:8.3f}s, {parallel.nodes:>8} nodes, "
+              f"{serial / elapsed:.2f}x speedup")
+
+
+if __name__ == "__main__":
+    main()
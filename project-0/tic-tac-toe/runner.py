@@ -3,6 +3,14 @@ import sys
 import time
 
 import tictactoe as ttt
+from aiworker import AIWorker
+from transposition import TranspositionTable
+
+# Positions the AI has already solved, saved between runs so it starts warm
+TABLE_FILE = "transposition.bin"
+
+# Shortest time the computer appears to think, so its moves are not instant
+MIN_THINKING_TIME = 0.5
 
 pygame.init()
 size = width, height = 600, 400
@@ -16,15 +24,21 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 18)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+table = TranspositionTable.load(TABLE_FILE)
+table_saved = False
+
+# Searches for AI moves in the background so the window keeps responding
+worker = AIWorker(lambda board: ttt.minimax(board, pruning=True, table=table))
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -110,13 +124,21 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if not worker.busy():
+                worker.start(board)
+            elif worker.elapsed() >= MIN_THINKING_TIME:
+                move = worker.poll()
+                if move is not None:
+                    board = ttt.result(board, move)
+
+            # Show how fast the search is going while it runs
+            if worker.busy():
+                thinking = smallFont.render(
+                    f"{worker.nodesPerSecond():,.0f} nodes/s", True, white
+                )
+                thinkingRect = thinking.get_rect()
+                thinkingRect.center = ((width / 2), 65)
+                screen.blit(thinking, thinkingRect)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,20 +149,30 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        if game_over and not table_saved:
+            try:
+                table.save(TABLE_FILE)
+            except OSError:
+                # A read-only directory or full disk only means the next
+                # run starts cold, so keep playing with the table in memory
+                pass
+            table_saved = True
+
+        # Offer a new game, which also stops the computer if it is thinking
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again" if game_over else "Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                worker.cancel()
+                user = None
+                board = ttt.initial_state()
+                table_saved = False
 
     pygame.display.flip()
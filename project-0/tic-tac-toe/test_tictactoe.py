@@ -0,0 +1,144 @@
+import os
+from functools import lru_cache
+
+import pytest
+
+import mnk
+import tictactoe as ttt
+import tournament
+from openingbook import OpeningBook
+from transposition import TranspositionTable
+
+
+def freeze(board):
+    return tuple(tuple(row) for row in board)
+
+
+@lru_cache(maxsize=None)
+def plainValue(key):
+    """
+    Returns the minimax value of a frozen board, without any table.
+    """
+    board = [list(row) for row in key]
+    if ttt.terminal(board):
+        return ttt.utility(board)
+    values = [plainValue(freeze(ttt.result(board, action))) for action in ttt.actions(board)]
+    return max(values) if ttt.player(board) == ttt.X else min(values)
+
+
+def reachable():
+    """
+    Returns every non-terminal board reachable from the initial state.
+    """
+    boards = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key = freeze(board)
+        if key in boards or ttt.terminal(board):
+            continue
+        boards[key] = board
+        frontier.extend(ttt.result(board, action) for action in ttt.actions(board))
+    return list(boards.values())
+
+
+POSITIONS = reachable()
+
+
+@pytest.fixture(scope="module")
+def warmedTable():
+    # Alpha-beta search leaves lower and upper bounds in the table
+    table = TranspositionTable()
+    for board in POSITIONS:
+        ttt.alphaBetaSearch(board, table)
+    return table
+
+
+def test_reachable_positions():
+    assert len(POSITIONS) == 4520
+
+
+def test_plain_values_with_warmed_table(warmedTable):
+    for board in POSITIONS:
+        if ttt.player(board) == ttt.X:
+            value = ttt.maxValue(board, warmedTable)
+        else:
+            value = ttt.minValue(board, warmedTable)
+        assert value == plainValue(freeze(board)), board
+
+
+def test_alpha_beta_actions_are_optimal(warmedTable):
+    for board in POSITIONS:
+        action = ttt.alphaBetaSearch(board, warmedTable)
+        assert plainValue(freeze(ttt.result(board, action))) == plainValue(freeze(board)), board
+
+
+def failingReplace(source, destination):
+    raise OSError("disk full")
+
+
+def test_table_save_round_trip_and_failure(warmedTable, tmp_path, monkeypatch):
+    path = str(tmp_path / "transposition.bin")
+    warmedTable.save(path)
+    loaded = TranspositionTable.load(path)
+    assert loaded.entries == warmedTable.entries
+
+    monkeypatch.setattr(os, "replace", failingReplace)
+    with pytest.raises(OSError):
+        warmedTable.save(path)
+    assert os.listdir(tmp_path) == ["transposition.bin"]
+
+
+def test_book_save_failure_leaves_no_temporary_file(tmp_path, monkeypatch):
+    book = OpeningBook.load(ttt.BOOK_FILE)
+    path = str(tmp_path / "book.bin")
+    book.save(path)
+    assert OpeningBook.load(path).entries == book.entries
+
+    monkeypatch.setattr(os, "replace", failingReplace)
+    with pytest.raises(OSError):
+        book.save(path)
+    assert os.listdir(tmp_path) == ["book.bin"]
+
+
+def test_mnk_timeout_leaves_board_unchanged():
+    game = mnk.MNKGame(5, 5, 4)
+    cells = game.flatten(game.initial_state())
+    cells[12] = ttt.X
+    before = list(cells)
+
+    # Time out a few nodes into the search, deep inside negamax
+    game.nodes = mnk.TIME_CHECK_INTERVAL - 5
+    game.deadline = 0
+    with pytest.raises(mnk.SearchTimeout):
+        game.negamax(cells, 6, -mnk.WIN - 1, mnk.WIN + 1, ttt.O, 1, 12, cells.count(ttt.EMPTY))
+    assert cells == before
+
+
+def test_mnk_heuristic_stays_below_win():
+    game = mnk.MNKGame(3, 15, 15)
+    cells = game.flatten(game.initial_state())
+    for square in range(14):
+        cells[square] = ttt.X
+    for mover in [ttt.X, ttt.O]:
+        assert abs(game.evaluate(cells, mover)) < mnk.WIN - len(cells)
+
+
+def test_tournament_openings_of_every_depth():
+    assert [len(tournament.exhaustiveOpenings(depth)) for depth in range(4)] == [1, 9, 72, 504]
+    for depth in range(tournament.MAX_OPENING_DEPTH + 1):
+        assert len(tournament.randomOpenings(3, depth, seed=0)) == 3
+    with pytest.raises(ValueError):
+        tournament.randomOpenings(3, tournament.MAX_OPENING_DEPTH + 1)
+
+
+@pytest.mark.parametrize("arguments", [
+    ["--depth", "9"],
+    ["--depth", "-1"],
+    ["--openings", "random", "--games", "0"]
+])
+def test_tournament_exits_without_openings(arguments, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["tournament.py", "--engines", "bitboard"] + arguments)
+    with pytest.raises(SystemExit) as exit:
+        tournament.main()
+    assert exit.value.code not in (0, None)
@@ -7,6 +7,8 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
+import threading
 
 X = "X"
 O = "O"
@@ -14,6 +16,28 @@ BOARD_LENGTH = 3
 BOARD_WIDTH = 3
 EMPTY = None
 
+# Order in which alpha-beta search tries moves: center, then corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Counts the board states visited by the search functions
+stats = {"nodes": 0}
+
+# Setting cancelled from another thread stops a search in progress, which
+# checks it every CANCEL_CHECK_INTERVAL board states
+cancelled = threading.Event()
+CANCEL_CHECK_INTERVAL = 1024
+
+# Opening book written by openingbook.py, loaded the first time minimax needs it
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+openingBook = None
+bookLoaded = False
+
+# Transposition table flags: whether a stored value is exact, or only a
+# lower or upper bound because alpha-beta search cut it off
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
 
 def initial_state():
     """
@@ -154,49 +178,204 @@ def utility(board):
         return 0
 
 
-def maxValue(state):
+class SearchCancelled(Exception):
+    """
+    Raised inside the search when cancelled is set.
+    """
+
+
+def countNode():
+    """
+    Counts a visited board state, stopping the search if it was cancelled
+    """
+    stats["nodes"] += 1
+    if stats["nodes"] % CANCEL_CHECK_INTERVAL == 0 and cancelled.is_set():
+        raise SearchCancelled()
+
+
+def maxValue(state, table=None):
     """
     Return the highest possible value that could come out of a given board state
     """
     # Maximizing function based on the lecture's pseudocode
+    countNode()
     if terminal(state):
         return utility(state)
+    if table is not None:
+        # Entries stored by alpha-beta search may only bound the value
+        entry = table.lookup(state)
+        if entry is not None and entry[1] == EXACT:
+            return entry[0]
     v = float("-inf")
     for action in actions(state):
-        v = max(v, minValue(result(state, action)))
+        v = max(v, minValue(result(state, action), table))
+    if table is not None:
+        table.store(state, v, EXACT)
     return v
 
 
-def minValue(state):
+def minValue(state, table=None):
     """
     Return the lowest possible value that could come out of a given board state
     """
     # Minimizing function based on the lecture's pseudocode
+    countNode()
     if terminal(state):
         return utility(state)
+    if table is not None:
+        # Entries stored by alpha-beta search may only bound the value
+        entry = table.lookup(state)
+        if entry is not None and entry[1] == EXACT:
+            return entry[0]
     v = float("inf")
     for action in actions(state):
-        v = min(v, maxValue(result(state, action)))
+        v = min(v, maxValue(result(state, action), table))
+    if table is not None:
+        table.store(state, v, EXACT)
     return v
 
 
-def minimax(board):
+def probeTable(table, state, alpha, beta):
     """
-    Returns the optimal action for the current player on the board.
+    Return (value, alpha, beta) after consulting the transposition table, where
+    value is not None if the stored entry already settles the search
+    """
+    entry = table.lookup(state)
+    if entry is None:
+        return None, alpha, beta
+    value, flag = entry
+    if flag == EXACT:
+        return value, alpha, beta
+    elif flag == LOWER:
+        alpha = max(alpha, value)
+    else:
+        beta = min(beta, value)
+    if alpha >= beta:
+        return value, alpha, beta
+    return None, alpha, beta
+
+
+def storeTable(table, state, v, alpha, beta):
+    """
+    Store a value found with the (alpha, beta) window, flagged by whether
+    it is exact or a bound
+    """
+    if v <= alpha:
+        table.store(state, v, UPPER)
+    elif v >= beta:
+        table.store(state, v, LOWER)
+    else:
+        table.store(state, v, EXACT)
+
+
+def orderedActions(state, killers, depth):
+    """
+    Return the legal actions in the order alpha-beta search should try them
+    """
+    # Try the killer move for this depth first, since it caused a cutoff in a
+    # sibling position, then fall back on center, corners and edges
+    legal = actions(state)
+    ordered = []
+    killer = killers.get(depth)
+    if killer in legal:
+        ordered.append(killer)
+    for action in MOVE_ORDER:
+        if action in legal and action != killer:
+            ordered.append(action)
+    return ordered
+
+
+def alphaBetaMax(state, alpha, beta, depth, killers, table=None):
+    """
+    Return the highest possible value of a given board state, or a bound on it
+    once it falls outside the (alpha, beta) window
+    """
+    countNode()
+    if terminal(state):
+        return utility(state)
+    originalAlpha, originalBeta = alpha, beta
+    if table is not None:
+        value, alpha, beta = probeTable(table, state, alpha, beta)
+        if value is not None:
+            return value
+    v = float("-inf")
+    for action in orderedActions(state, killers, depth):
+        v = max(v, alphaBetaMin(result(state, action), alpha, beta, depth + 1, killers, table))
+        if v >= beta:
+            # The minimizing player will never allow this position, so stop
+            # searching it and remember the move that refuted it
+            killers[depth] = action
+            break
+        alpha = max(alpha, v)
+    if table is not None:
+        storeTable(table, state, v, originalAlpha, originalBeta)
+    return v
+
+
+def alphaBetaMin(state, alpha, beta, depth, killers, table=None):
+    """
+    Return the lowest possible value of a given board state, or a bound on it
+    once it falls outside the (alpha, beta) window
+    """
+    countNode()
+    if terminal(state):
+        return utility(state)
+    originalAlpha, originalBeta = alpha, beta
+    if table is not None:
+        value, alpha, beta = probeTable(table, state, alpha, beta)
+        if value is not None:
+            return value
+    v = float("inf")
+    for action in orderedActions(state, killers, depth):
+        v = min(v, alphaBetaMax(result(state, action), alpha, beta, depth + 1, killers, table))
+        if v <= alpha:
+            killers[depth] = action
+            break
+        beta = min(beta, v)
+    if table is not None:
+        storeTable(table, state, v, originalAlpha, originalBeta)
+    return v
+
+
+def alphaBetaSearch(board, table=None):
+    """
+    Returns the optimal action for the current player on the board, using
+    alpha-beta pruning with move ordering and killer moves.
+    """
+    # Killer moves are keyed by depth below the root and shared across the search
+    killers = {}
+    alpha = float("-inf")
+    beta = float("inf")
+    optimalAction = None
+    if player(board) == "X":
+        for action in orderedActions(board, killers, 0):
+            valueOfAction = alphaBetaMin(result(board, action), alpha, beta, 1, killers, table)
+            if valueOfAction > alpha:
+                alpha = valueOfAction
+                optimalAction = action
+    else:
+        for action in orderedActions(board, killers, 0):
+            valueOfAction = alphaBetaMax(result(board, action), alpha, beta, 1, killers, table)
+            if valueOfAction < beta:
+                beta = valueOfAction
+                optimalAction = action
+    return optimalAction
+
+
+def plainSearch(board, table=None):
+    """
+    Returns the optimal action for the current player on the board by
+    searching the full game tree.
     """
     # To implement minimax, we're going to get all the possible moves in a given
     # board and see what results from the position when the opponent plays optimally.
     # Out of all the possibilities, the one with the biggest value is chosen as the
     # optimal move to play
-    currentPlayer = player(board)
-    if currentPlayer == "X":
-        # Optimization for when the computer is playing "X" and it is the first move
-        if (board == initial_state()):
-            return (0, 1)
+    if player(board) == "X":
         v = float("-inf")
         optimalAction = None
         for action in actions(board):
-            valueOfAction = minValue(result(board, action))
+            valueOfAction = minValue(result(board, action), table)
             if valueOfAction > v:
                 v = valueOfAction
                 optimalAction = action
@@ -205,8 +384,50 @@ def minimax(board):
         v = float("inf")
         optimalAction = None
         for action in actions(board):
-            valueOfAction = maxValue(result(board, action))
+            valueOfAction = maxValue(result(board, action), table)
             if valueOfAction < v:
                 v = valueOfAction
                 optimalAction = action
         return optimalAction
+
+
+def bookMove(board):
+    """
+    Returns the opening book's optimal action for the board, or None if there
+    is no book file or the board is not in it.
+    """
+    global openingBook, bookLoaded
+    if not bookLoaded:
+        # Imported here because openingbook itself builds on this module
+        from openingbook import OpeningBook
+        openingBook = OpeningBook.load(BOOK_FILE)
+        bookLoaded = True
+    if openingBook is None:
+        return None
+    entry = openingBook.lookup(board)
+    return None if entry is None else entry[0]
+
+
+def minimax(board, pruning=False, table=None, useBook=True):
+    """
+    Returns the optimal action for the current player on the board.
+
+    Positions in the opening book are answered with a single lookup. Otherwise,
+    with pruning, alpha-beta search returns an action of the same value
+    while visiting far fewer board states. A transposition table, such as
+    transposition.TranspositionTable, lets the search reuse the values of
+    positions it has already seen, including in earlier moves.
+    """
+    if terminal(board):
+        return None
+    if useBook:
+        action = bookMove(board)
+        if action is not None:
+            return action
+    if pruning:
+        return alphaBetaSearch(board, table)
+
+    # Optimization for when the computer is playing "X" and it is the first move
+    if board == initial_state() and table is None:
+        return (0, 1)
+    return plainSearch(board, table)
@@ -0,0 +1,201 @@
+# Self-play tournament for the tic-tac-toe engines
+# Plays every pairing of engines from a set of openings, checks that each
+# game ends with the opening's minimax value (a draw from the empty board),
+# and reports how fast each pairing moves
+
+import argparse
+import itertools
+import random
+import time
+
+import bitboard
+import tictactoe as ttt
+from benchmark import exactValue
+from transposition import TranspositionTable
+
+# Every game is over once the board is full, so openings can be at most
+# one move shorter than that
+MAX_OPENING_DEPTH = ttt.BOARD_LENGTH * ttt.BOARD_WIDTH - 1
+
+
+def plainEngine():
+    return lambda board: ttt.minimax(board, useBook=False), ttt.stats
+
+
+def alphaBetaEngine():
+    return lambda board: ttt.minimax(board, pruning=True, useBook=False), ttt.stats
+
+
+def tableEngine():
+    # The table lives as long as the engine, as it does between games in runner.py
+    table = TranspositionTable()
+    return lambda board: ttt.minimax(board, pruning=True, table=table, useBook=False), ttt.stats
+
+
+def bitboardEngine():
+    return bitboard.minimax, bitboard.stats
+
+
+def bookEngine():
+    return lambda board: ttt.minimax(board, pruning=True), ttt.stats
+
+
+# Each engine is created by a function returning (search, stats), where
+# stats["nodes"] counts the board states the search visits
+ENGINES = {
+    "minimax": plainEngine,
+    "alpha-beta": alphaBetaEngine,
+    "table": tableEngine,
+    "bitboard": bitboardEngine,
+    "book": bookEngine
+}
+
+
+def exhaustiveOpenings(depth):
+    """
+    Returns every sequence of depth moves from the initial state that does
+    not end the game.
+    """
+    openings = [[]]
+    for _ in range(depth):
+        longer = []
+        for opening in openings:
+            board = play(opening)
+            for action in sorted(ttt.actions(board)):
+                if not ttt.terminal(ttt.result(board, action)):
+                    longer.append(opening + [action])
+        openings = longer
+    return openings
+
+
+def randomOpenings(count, depth, seed=None):
+    """
+    Returns count random sequences of depth moves that do not end the game.
+    """
+    if not 0 <= depth <= MAX_OPENING_DEPTH:
+        raise ValueError(f"openings must be between 0 and {MAX_OPENING_DEPTH} moves long")
+    rng = random.Random(seed)
+    openings = []
+    while len(openings) < count:
+        opening = []
+        board = ttt.initial_state()
+        for _ in range(depth):
+            action = rng.choice(sorted(ttt.actions(board)))
+            opening.append(action)
+            board = ttt.result(board, action)
+            if ttt.terminal(board):
+                break
+        else:
+            openings.append(opening)
+    return openings
+
+
+def play(moves):
+    """
+    Returns the board after playing a sequence of moves from the initial state.
+    """
+    board = ttt.initial_state()
+    for action in moves:
+        board = ttt.result(board, action)
+    return board
+
+
+def percentile(sortedValues, fraction):
+    """
+    Returns the nearest-rank percentile of an ascending list.
+    """
+    if not sortedValues:
+        return 0.0
+    index = max(0, min(len(sortedValues) - 1, int(fraction * len(sortedValues) + 0.5) - 1))
+    return sortedValues[index]
+
+
+def playGame(opening, engines, values):
+    """
+    Plays a game from an opening with engines mapping each player to its
+    (search, stats), and returns (expected, result, latencies, nodes): the
+    opening's minimax value, the game's utility, and the seconds and board
+    states each engine move took.
+    """
+    board = play(opening)
+    expected = exactValue(board, values)
+    latencies = []
+    nodes = []
+    while not ttt.terminal(board):
+        search, stats = engines[ttt.player(board)]
+        startNodes = stats["nodes"]
+        start = time.perf_counter()
+        action = search(board)
+        latencies.append(time.perf_counter() - start)
+        nodes.append(stats["nodes"] - startNodes)
+        board = ttt.result(board, action)
+    return expected, ttt.utility(board), latencies, nodes
+
+
+def runTournament(names, openings):
+    """
+    Plays every opening for every ordered pairing of the named engines,
+    printing one line of results per pairing. Returns the number of games
+    that did not end with the opening's minimax value.
+    """
+    values = {}
+    engines = {name: ENGINES[name]() for name in names}
+    failures = 0
+    print(f"{'X':>10} {'O':>10} {'games':>6} {'wrong':>5} {'moves/s':>9} "
+          f"{'nodes/move':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for xName, oName in itertools.product(names, repeat=2):
+        pairing = {ttt.X: engines[xName], ttt.O: engines[oName]}
+        latencies = []
+        nodes = []
+        wrong = 0
+        for opening in openings:
+            expected, outcome, gameLatencies, gameNodes = playGame(opening, pairing, values)
+            latencies.extend(gameLatencies)
+            nodes.extend(gameNodes)
+            if outcome != expected:
+                wrong += 1
+                print(f"{xName} vs {oName} scored {outcome} instead of {expected} "
+                      f"after opening {opening}")
+        failures += wrong
+
+        latencies.sort()
+        total = sum(latencies)
+        movesPerSecond = len(latencies) / total if total else float("inf")
+        nodesPerMove = sum(nodes) / len(nodes) if nodes else 0
+        print(f"{xName:>10} {oName:>10} {len(openings):>6} {wrong:>5} {movesPerSecond:>9.0f} "
+              f"{nodesPerMove:>10.1f} " + " ".join(
+                  f"{1000 * percentile(latencies, fraction):>8.3f}"
+                  for fraction in [0.5, 0.9, 0.99, 1.0]
+              ))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the tic-tac-toe engines against each other.")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES),
+                        default=["alpha-beta", "table", "bitboard", "book"],
+                        help="engines to pair up (minimax is slow from short openings)")
+    parser.add_argument("--openings", choices=["exhaustive", "random"], default="exhaustive",
+                        help="play every opening of the given depth, or random ones")
+    parser.add_argument("--depth", type=int, choices=range(MAX_OPENING_DEPTH + 1), default=2,
+                        metavar=f"0-{MAX_OPENING_DEPTH}", help="moves in each opening")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="random openings to play for each pairing")
+    parser.add_argument("--seed", type=int, help="seed for random openings")
+    args = parser.parse_args()
+
+    if args.openings == "exhaustive":
+        openings = exhaustiveOpenings(args.depth)
+    else:
+        openings = randomOpenings(args.games, args.depth, args.seed)
+    if not openings:
+        raise SystemExit("There are no openings to play.")
+
+    failures = runTournament(args.engines, openings)
+    if failures:
+        raise SystemExit(f"{failures} games did not end with perfect play.")
+    print("Every game ended with perfect play.")
+
+
+if __name__ == "__main__":
+    main()
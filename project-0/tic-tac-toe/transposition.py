@@ -0,0 +1,194 @@
+# Transposition table for the tic-tac-toe AI
+# Remembers the values of board states already searched, treating the
+# 8 rotations and reflections of a board as the same position
+
+import argparse
+import os
+import struct
+from array import array
+from collections import OrderedDict
+
+import tictactoe as ttt
+
+# Each symmetry maps square k (numbered row by row) of the transformed
+# board to the square of the original board it is read from
+IDENTITY = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+ROTATE = [6, 3, 0, 7, 4, 1, 8, 5, 2]
+REFLECT = [2, 1, 0, 5, 4, 3, 8, 7, 6]
+
+
+def compose(first, second):
+    """
+    Returns the symmetry that applies first and then second.
+    """
+    return [first[second[k]] for k in range(9)]
+
+
+SYMMETRIES = []
+for reflection in [IDENTITY, REFLECT]:
+    rotation = reflection
+    for _ in range(4):
+        SYMMETRIES.append(rotation)
+        rotation = compose(rotation, ROTATE)
+
+# Default number of entries kept, which comfortably holds every position
+MAX_ENTRIES = 100000
+
+MAGIC = b"TTT\x01"
+HEADER = struct.Struct("<4sI")
+
+SQUARE_CODES = {ttt.EMPTY: 0, ttt.X: 1, ttt.O: 2}
+
+
+def squares(board):
+    """
+    Returns the board's squares as a flat list, row by row.
+    """
+    return [board[i][j] for i in range(ttt.BOARD_LENGTH) for j in range(ttt.BOARD_WIDTH)]
+
+
+def canonicalize(board):
+    """
+    Returns (key, symmetry) where key is the smallest base-3 code of the
+    board over all 8 symmetries, and symmetry is one that produces it.
+    """
+    codes = [SQUARE_CODES[square] for square in squares(board)]
+    best = None
+    bestSymmetry = None
+    for symmetry in SYMMETRIES:
+        code = 0
+        for k in range(8, -1, -1):
+            code = code * 3 + codes[symmetry[k]]
+        if best is None or code < best:
+            best = code
+            bestSymmetry = symmetry
+    return best, bestSymmetry
+
+
+def writeFile(path, chunks):
+    """
+    Writes chunks of bytes to path through a temporary file named after
+    this process, so no reader or other writer ever sees half a file, and
+    removes the temporary file if writing fails.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def canonicalKey(board):
+    return canonicalize(board)[0]
+
+
+class TranspositionTable():
+    """
+    Bounded map from canonical board keys to (value, flag) entries,
+    evicting the least recently used entry when it is full. The flag
+    records whether a value is exact or only a bound (see tictactoe).
+    """
+
+    def __init__(self, maxEntries=MAX_ENTRIES):
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns the (value, flag) entry for a key, or None.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value, flag=ttt.EXACT):
+        self.entries[key] = (value, flag)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def lookup(self, board):
+        """
+        Returns the (value, flag) entry for a board or any of its
+        rotations and reflections, or None.
+        """
+        return self.get(canonicalKey(board))
+
+    def store(self, board, value, flag=ttt.EXACT):
+        self.put(canonicalKey(board), value, flag)
+
+    def save(self, path):
+        """
+        Writes the table to a binary file, least recently used first.
+        """
+        keys = array("H", self.entries.keys())
+        values = array("b", (value for value, _ in self.entries.values()))
+        flags = array("B", (flag for _, flag in self.entries.values()))
+        writeFile(path, [
+            HEADER.pack(MAGIC, len(keys)), keys.tobytes(), values.tobytes(), flags.tobytes()
+        ])
+
+    @classmethod
+    def load(cls, path, maxEntries=MAX_ENTRIES):
+        """
+        Returns a table read from a file written by save, or an empty
+        table if the file is missing or not a saved table.
+        """
+        table = cls(maxEntries)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return table
+        if len(data) < HEADER.size:
+            return table
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) != HEADER.size + 4 * count:
+            return table
+
+        keys = array("H")
+        values = array("b")
+        flags = array("B")
+        position = HEADER.size
+        keys.frombytes(data[position:position + 2 * count])
+        position += 2 * count
+        values.frombytes(data[position:position + count])
+        position += count
+        flags.frombytes(data[position:position + count])
+        for key, value, flag in zip(keys, values, flags):
+            table.put(key, value, flag)
+        return table
+
+
+def main():
+    """
+    Solves the game from the initial state and saves the warmed-up table.
+    """
+    parser = argparse.ArgumentParser(description="Build a transposition table for tic-tac-toe.")
+    parser.add_argument("path", nargs="?", default="transposition.bin")
+    args = parser.parse_args()
+
+    table = TranspositionTable()
+    ttt.minimax(ttt.initial_state(), table=table, useBook=False)
+    table.save(args.path)
+    print(f"Saved {len(table)} positions to {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import time
+
+from generator import generate
+from knowledge import KnowledgeBase
+from logic import model_check
+from vectorized import np
+
+# Largest number of symbols each strategy is timed on by default, beyond
+# which it takes too long or, for the truth tables, too much memory
+LIMITS = {
+    "enumerate": 16,
+    "cnf": 18,
+    "parallel": 18,
+    "kb": 22,
+    "vectorized": 26,
+    "sat": None
+}
+
+
+def ask_all(strategy, knowledge, symbols):
+    """Returns the symbols that knowledge entails, according to a strategy."""
+    if strategy == "kb":
+        knowledgeBase = KnowledgeBase(*knowledge.conjuncts)
+        return [symbol for symbol in symbols if knowledgeBase.ask(symbol)]
+    return [symbol for symbol in symbols if model_check(knowledge, symbol, strategy)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every entailment strategy on generated puzzles.")
+    parser.add_argument("--people", type=int, nargs="+", default=[2, 4, 6, 8, 10, 12, 16, 24, 32],
+                        help="numbers of characters, with two symbols per character")
+    parser.add_argument("--depth", type=int, default=2, help="nesting depth of statements")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--strategies", nargs="+", choices=list(LIMITS), default=list(LIMITS),
+                        help="strategies to time")
+    parser.add_argument("--no-limits", dest="limits", action="store_false",
+                        help="time every strategy at every size")
+    args = parser.parse_args()
+
+    strategies = [
+        strategy for strategy in args.strategies
+        if strategy != "vectorized" or np is not None
+    ]
+    print(f"{'people':>6} {'symbols':>7} " + " ".join(f"{strategy:>10}" for strategy in strategies))
+    for people in args.people:
+        knowledge, symbols, solution = generate(people, args.depth, seed=args.seed + people)
+        answers = {}
+        timings = []
+        for strategy in strategies:
+            limit = LIMITS[strategy]
+            if args.limits and limit is not None and len(symbols) > limit:
+                timings.append("-")
+                continue
+            start = time.perf_counter()
+            answers[strategy] = ask_all(strategy, knowledge, symbols)
+            timings.append(f"{time.perf_counter() - start:.3f}s")
+
+        # Every strategy must find the same entailed symbols, all of which
+        # hold in the solution the puzzle was generated from
+        if len(set(map(tuple, answers.values()))) > 1:
+            raise AssertionError(f"strategies disagree with {people} people: {answers}")
+        for entailed in answers.values():
+            if not all(solution[symbol.name] for symbol in entailed):
+                raise AssertionError(f"an entailed symbol is false in the solution with {people} people")
+        print(f"{people:>6} {len(symbols):>7} " + " ".join(f"{timing:>10}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
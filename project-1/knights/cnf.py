@@ -0,0 +1,233 @@
+import math
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    A sentence compiled to conjunctive normal form over numbered symbols.
+
+    Symbol i of `symbols` is bit i of a model, which is an int whose set
+    bits are the true symbols. Each clause is a pair of bitmasks
+    (positive, negative) holding the symbols that appear in it plain and
+    negated, so a model satisfies the clause if it sets any bit of
+    positive or clears any bit of negative.
+
+    Variables the conversion introduced for subformulas take the bits after
+    the symbols. `definitions` lists the bit of each with the clauses of its
+    subformula, in an order where those only use earlier bits, so its value
+    in a model of the symbols can be computed before evaluating the clauses.
+    """
+
+    def __init__(self, symbols, clauses, definitions=()):
+        self.symbols = symbols
+        self.clauses = clauses
+        self.definitions = list(definitions)
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def __repr__(self):
+        return (f"CNF({len(self.symbols)} symbols, {len(self.definitions)} definitions, "
+                f"{len(self.clauses)} clauses)")
+
+    def evaluate(self, model):
+        """Evaluates the sentence in a model of its symbols given as a bitmask."""
+        for bit, definition in self.definitions:
+            if satisfies(model, definition):
+                model |= bit
+        return satisfies(model, self.clauses)
+
+    def model(self, assignment):
+        """Returns the bitmask of a model given as a dict of symbol names."""
+        bits = 0
+        for i, name in enumerate(self.symbols):
+            if assignment[name]:
+                bits |= 1 << i
+        return bits
+
+
+def satisfies(model, clauses):
+    """Checks if a bitmask model satisfies every clause of a list of bitmask pairs."""
+    for positive, negative in clauses:
+        if not (model & positive or ~model & negative):
+            return False
+    return True
+
+
+# Distributing a disjunction over conjunctions multiplies their numbers of
+# clauses, so once a product would exceed this many clauses the largest
+# operands are replaced by new variables instead (the Tseitin encoding)
+MAX_CLAUSES = 64
+
+
+def clauses(sentence, negated=False, definitions=None, limit=MAX_CLAUSES):
+    """
+    Returns the CNF clauses of a sentence, or of its negation, as a list of
+    frozensets of (symbol name, truth value) literals.
+
+    Where distributing would produce more than limit clauses, a subformula
+    is replaced by a new variable, named by the subformula itself, and
+    clauses making the variable equivalent to it are added. definitions
+    maps each such subformula to its own clauses, in the order they were
+    defined; sharing it between calls shares their new variables, and
+    each definition's clauses are only returned by the call that adds it.
+    """
+    conversion = Conversion({} if definitions is None else definitions, limit)
+    return conjoin([conversion.expand(sentence, negated), conversion.defining])
+
+
+class Conversion():
+    """
+    Converts sentences to clauses, remembering the clauses of each
+    subformula and of its negation, which a Biconditional needs both of.
+    """
+
+    def __init__(self, definitions, limit):
+        self.definitions = definitions
+        self.limit = limit
+        self.defining = []
+        self.expanded = {}
+
+    def expand(self, sentence, negated):
+        """Returns the clauses of a sentence, or of its negation."""
+        key = (sentence, negated)
+        if key not in self.expanded:
+            self.expanded[key] = self.convert(sentence, negated)
+        return self.expanded[key]
+
+    def convert(self, sentence, negated):
+        if isinstance(sentence, Symbol):
+            return [frozenset([(sentence.name, not negated)])]
+        if isinstance(sentence, Not):
+            return self.expand(sentence.operand, not negated)
+        if isinstance(sentence, Biconditional):
+            # a <=> b is (¬a ∨ b) ∧ (a ∨ ¬b), and its negation is (a ∨ b) ∧ (¬a ∨ ¬b)
+            left = sentence.left
+            right = sentence.right
+            return conjoin([
+                self.disjoin([(left, True), (right, negated)]),
+                self.disjoin([(left, False), (right, not negated)])
+            ])
+
+        if isinstance(sentence, And):
+            operands = [(conjunct, negated) for conjunct in sentence.conjuncts]
+            disjunction = negated
+        elif isinstance(sentence, Or):
+            operands = [(disjunct, negated) for disjunct in sentence.disjuncts]
+            disjunction = not negated
+        elif isinstance(sentence, Implication):
+            # a => b is equivalent to ¬a ∨ b, whose negation is a ∧ ¬b
+            operands = [(sentence.antecedent, not negated), (sentence.consequent, negated)]
+            disjunction = not negated
+        else:
+            raise TypeError(f"cannot convert {sentence!r} to clauses")
+        if disjunction:
+            return self.disjoin(operands)
+        return conjoin([self.expand(operand, negation) for operand, negation in operands])
+
+    def disjoin(self, operands):
+        """
+        Returns the clauses of the disjunction of several operands, given as
+        (sentence, negated) pairs, replacing the operands with the most
+        clauses by new variables until distributing makes at most limit
+        clauses.
+        """
+        parts = [self.expand(operand, negation) for operand, negation in operands]
+        while math.prod(len(part) for part in parts) > self.limit:
+            i = max(range(len(parts)), key=lambda i: len(parts[i]))
+            operand, negation = operands[i]
+            parts[i] = [frozenset([(self.define(operand), not negation)])]
+        return distribute(parts)
+
+    def define(self, sentence):
+        """
+        Returns the name of a variable equivalent to a sentence, adding the
+        clauses x => sentence and ¬x => ¬sentence the first time.
+        """
+        if sentence not in self.definitions:
+            true = self.expand(sentence, False)
+            false = self.expand(sentence, True)
+            self.definitions[sentence] = true
+            self.defining.extend(clause | {(sentence, False)} for clause in true)
+            self.defining.extend(clause | {(sentence, True)} for clause in false)
+        return sentence
+
+
+def conjoin(parts):
+    """Returns the clauses of the conjunction of several clause lists."""
+    result = []
+    seen = set()
+    for part in parts:
+        for clause in part:
+            if clause not in seen:
+                seen.add(clause)
+                result.append(clause)
+    return result
+
+
+def distribute(parts):
+    """
+    Returns the clauses of the disjunction of several clause lists, by
+    distributing the disjunction over the conjunctions and dropping
+    clauses that are always true.
+    """
+    result = [frozenset()]
+    for part in parts:
+        combined = []
+        seen = set()
+        for clause in result:
+            for other in part:
+                merged = clause | other
+                if merged not in seen and not tautology(merged):
+                    seen.add(merged)
+                    combined.append(merged)
+        result = combined
+    return result
+
+
+def tautology(clause):
+    """Checks if a clause contains both a symbol and its negation."""
+    return any((name, not value) in clause for name, value in clause)
+
+
+def compile_cnf(sentence, symbols=None, limit=MAX_CLAUSES):
+    """
+    Compiles a sentence to CNF. `symbols` fixes the order of the symbol
+    bits and must include every symbol in the sentence; by default the
+    sentence's symbols are numbered in sorted order.
+    """
+    if symbols is None:
+        symbols = sorted(sentence.symbols())
+    definitions = {}
+    sentence_clauses = clauses(sentence, definitions=definitions, limit=limit)
+    index = {name: i for i, name in enumerate(list(symbols) + list(definitions))}
+
+    def compile_clauses(literals):
+        compiled = []
+        for clause in literals:
+            positive = 0
+            negative = 0
+            for name, value in clause:
+                if value:
+                    positive |= 1 << index[name]
+                else:
+                    negative |= 1 << index[name]
+            compiled.append((positive, negative))
+        return compiled
+
+    return CNF(list(symbols), compile_clauses(sentence_clauses), [
+        (1 << index[subformula], compile_clauses(definition))
+        for subformula, definition in definitions.items()
+    ])
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, enumerating bitmask models."""
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    knowledge = compile_cnf(knowledge, symbols)
+    query = compile_cnf(query, symbols)
+    for model in range(1 << len(symbols)):
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
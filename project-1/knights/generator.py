@@ -0,0 +1,104 @@
+import argparse
+import random
+
+from logic import And, Implication, Not, Or, Symbol
+
+
+def characters(people):
+    """Returns the knight and knave symbols of each of several characters."""
+    names = [chr(ord("A") + i) if i < 26 else f"P{i}" for i in range(people)]
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+    return names, knights, knaves
+
+
+def statement(rng, knights, knaves, depth):
+    """
+    Returns a random statement about the characters, nested up to depth
+    connectives deep.
+    """
+    if depth == 0 or rng.random() < 0.25:
+        person = rng.randrange(len(knights))
+        return rng.choice([knights, knaves])[person]
+    connective = rng.choice([And, Or, Implication, Not])
+    if connective is Not:
+        return negate(statement(rng, knights, knaves, depth - 1))
+    return connective(
+        statement(rng, knights, knaves, depth - 1),
+        statement(rng, knights, knaves, depth - 1)
+    )
+
+
+def negate(sentence):
+    """Returns the negation of a sentence without stacking up double negations."""
+    return sentence.operand if isinstance(sentence, Not) else Not(sentence)
+
+
+def generate(people, depth=2, seed=None):
+    """
+    Returns (knowledge, symbols, solution) for a random puzzle where every
+    character makes one statement. solution maps each symbol name to its
+    value in a hidden assignment of knights and knaves that the knowledge
+    is consistent with, though other assignments may fit it too.
+    """
+    rng = random.Random(seed)
+    names, knights, knaves = characters(people)
+    roles = [rng.random() < 0.5 for _ in range(people)]
+    solution = {}
+    for knight, knave, role in zip(knights, knaves, roles):
+        solution[knight.name] = role
+        solution[knave.name] = not role
+
+    knowledge = []
+    for knight, knave, role in zip(knights, knaves, roles):
+        # Each character is a knight or a knave, but not both
+        knowledge.append(Or(knight, knave))
+        knowledge.append(Not(And(knight, knave)))
+
+        # Knights tell the truth and knaves lie, so pick a statement that
+        # is true exactly when the speaker is a knight
+        said = statement(rng, knights, knaves, depth)
+        if said.evaluate(solution) != role:
+            said = negate(said)
+        knowledge.append(Implication(knight, said))
+        knowledge.append(Implication(knave, negate(said)))
+
+    return And(*knowledge), knights + knaves, solution
+
+
+def chain(people):
+    """
+    Returns a knights and knaves puzzle where person 0 is a knight and
+    everyone else says the person before them is a knave, and its symbols.
+    """
+    knights = [Symbol(f"{i} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(people)]
+    sentences = [knights[0]]
+    for i in range(people):
+        sentences.append(Or(knights[i], knaves[i]))
+        sentences.append(Not(And(knights[i], knaves[i])))
+        if i:
+            sentences.append(Implication(knights[i], knaves[i - 1]))
+            sentences.append(Implication(knaves[i], Not(knaves[i - 1])))
+    return And(*sentences), knights + knaves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a random knights and knaves puzzle.")
+    parser.add_argument("people", type=int, help="number of characters")
+    parser.add_argument("--depth", type=int, default=2, help="nesting depth of statements")
+    parser.add_argument("--seed", type=int, help="random seed")
+    args = parser.parse_args()
+
+    knowledge, symbols, solution = generate(args.people, args.depth, args.seed)
+    names, knights, _ = characters(args.people)
+    for name, said in zip(names, knowledge.conjuncts[2::4]):
+        print(f"{name} says: {said.consequent.formula()}")
+    print("One solution: " + ", ".join(
+        f"{name} is a {'Knight' if solution[knight.name] else 'Knave'}"
+        for name, knight in zip(names, knights)
+    ))
+
+
+if __name__ == "__main__":
+    main()
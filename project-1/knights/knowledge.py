@@ -0,0 +1,124 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def column(i, num_symbols):
+    """
+    Returns the truth table column of symbol i over 2 ** num_symbols
+    models, as an int whose bit m is set if model m makes symbol i true.
+    Model m makes symbol i true when bit i of m is set.
+    """
+    width = 1 << i
+    block = ((1 << width) - 1) << width
+    repeat = ((1 << (1 << num_symbols)) - 1) // ((1 << (2 * width)) - 1)
+    return block * repeat
+
+
+def replicate(bits, num_symbols, added):
+    """
+    Returns a truth table over num_symbols symbols extended with `added`
+    new symbols, keeping the same rows for every value of the new symbols.
+    """
+    size = 1 << num_symbols
+    repeat = ((1 << (size << added)) - 1) // ((1 << size) - 1)
+    return bits * repeat
+
+
+class KnowledgeBase():
+    """
+    Conjunction of sentences that answers entailment queries from a cached
+    truth table.
+
+    The table holds one bit per model of the known symbols, set if the
+    model satisfies every sentence told so far, packed into a single int.
+    A query is evaluated over all models at once with bitwise operations,
+    and is entailed if it is true in every model the table has set.
+    """
+
+    def __init__(self, *sentences):
+        self.symbols = []
+        self.index = {}
+        self.columns = []
+        self.models = 1
+        self.full = 1
+        self.answers = {}
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def __len__(self):
+        """Returns the number of models that satisfy the knowledge base."""
+        return self.models.bit_count()
+
+    def add_symbols(self, names):
+        """Extends the truth table with new symbols, which start unconstrained."""
+        names = sorted(name for name in names if name not in self.index)
+        if not names:
+            return
+        self.models = replicate(self.models, len(self.symbols), len(names))
+        for name in names:
+            self.index[name] = len(self.symbols)
+            self.symbols.append(name)
+        self.columns = [column(i, len(self.symbols)) for i in range(len(self.symbols))]
+        self.full = (1 << (1 << len(self.symbols))) - 1
+
+    def truth_table(self, sentence, memo=None):
+        """
+        Returns the truth table of a sentence over the known symbols, as an
+        int whose bit m is set if model m satisfies it. Subformulas shared
+        within the sentence are evaluated once.
+        """
+        if memo is None:
+            memo = {}
+        if sentence in memo:
+            return memo[sentence]
+
+        if isinstance(sentence, Symbol):
+            bits = self.columns[self.index[sentence.name]]
+        elif isinstance(sentence, Not):
+            bits = self.full ^ self.truth_table(sentence.operand, memo)
+        elif isinstance(sentence, And):
+            bits = self.full
+            for conjunct in sentence.conjuncts:
+                bits &= self.truth_table(conjunct, memo)
+        elif isinstance(sentence, Or):
+            bits = 0
+            for disjunct in sentence.disjuncts:
+                bits |= self.truth_table(disjunct, memo)
+        elif isinstance(sentence, Implication):
+            bits = (self.full ^ self.truth_table(sentence.antecedent, memo)) \
+                | self.truth_table(sentence.consequent, memo)
+        elif isinstance(sentence, Biconditional):
+            bits = self.full ^ (self.truth_table(sentence.left, memo)
+                                  ^ self.truth_table(sentence.right, memo))
+        else:
+            raise TypeError(f"cannot evaluate {sentence!r}")
+
+        memo[sentence] = bits
+        return bits
+
+    def tell(self, sentence):
+        """
+        Adds a sentence to the knowledge base, keeping only the models that
+        satisfy it.
+        """
+        self.add_symbols(sentence.symbols())
+        self.models &= self.truth_table(sentence)
+
+        # Adding knowledge never takes back an entailment, so only queries
+        # that were not entailed need to be asked again
+        self.answers = {query: True for query, answer in self.answers.items() if answer}
+
+    def ask(self, query):
+        """Checks if the knowledge base entails query."""
+        if query in self.answers:
+            return self.answers[query]
+
+        # Symbols only the query mentions are unconstrained by the knowledge base
+        if not query.symbols() <= self.index.keys():
+            self.add_symbols(query.symbols())
+        answer = self.models & ~self.truth_table(query) == 0
+        self.answers[query] = answer
+        return answer
+
+    def consistent(self):
+        """Checks if any model satisfies the knowledge base."""
+        return self.models != 0
@@ -1,10 +1,65 @@
 import itertools
+import weakref
+
+# Subformulas of at least this many nodes are evaluated once per model;
+# smaller ones are cheaper to evaluate again than to look up
+MEMO_SIZE = 8
+
+# Every sentence that exists, keyed by its class and parts, so that building
+# a sentence equal to an existing one returns that same object
+interned = weakref.WeakValueDictionary()
 
 
 class Sentence():
+    """
+    Sentences are immutable and interned: equal sentences are the same
+    object, so identical subformulas are shared, compared by identity, and
+    hash in constant time. Each caches its hash and its set of symbols.
+    """
+
+    __slots__ = ("hash_value", "symbol_set", "size", "memoize", "__weakref__")
+
+    @classmethod
+    def intern(cls, key, hash_value, symbol_set, children, **fields):
+        """Returns the interned sentence for key, creating it from fields if needed."""
+        sentence = interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for name, value in fields.items():
+                object.__setattr__(sentence, name, value)
+            object.__setattr__(sentence, "hash_value", hash_value)
+            object.__setattr__(sentence, "symbol_set", frozenset(symbol_set))
+            object.__setattr__(sentence, "size", 1 + sum(child.size for child in children))
+            object.__setattr__(sentence, "memoize", sentence.size >= MEMO_SIZE)
+            interned[key] = sentence
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("sentences are immutable")
+
+    def __eq__(self, other):
+        return self is other
 
-    def evaluate(self, model):
-        """Evaluates the logical sentence."""
+    def __hash__(self):
+        return self.hash_value
+
+    def evaluate(self, model, memo=None):
+        """
+        Evaluates the logical sentence. A memo dict, shared by every call
+        for the same model, evaluates each subformula of at least MEMO_SIZE
+        nodes only once, however many sentences share it.
+        """
+        if memo is None or not self.memoize:
+            return self.truth(model, memo)
+        if self not in memo:
+            memo[self] = self.truth(model, memo)
+        return memo[self]
+
+    def truth(self, model, memo):
+        """Evaluates the logical sentence from the values of its parts."""
         raise Exception("nothing to evaluate")
 
     def formula(self):
@@ -12,8 +67,8 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return self.symbol_set
 
     @classmethod
     def validate(cls, sentence):
@@ -43,20 +98,18 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def __new__(cls, name):
+        return cls.intern((cls, name), hash(("symbol", name)), [name], [], name=name)
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __reduce__(self):
+        return (type(self), (self.name,))
 
     def __repr__(self):
         return self.name
 
-    def evaluate(self, model):
+    def evaluate(self, model, memo=None):
         try:
             return bool(model[self.name])
         except KeyError:
@@ -65,48 +118,46 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
-
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        return cls.intern(
+            (cls, operand), hash(("not", hash(operand))), operand.symbol_set,
+            [operand], operand=operand
+        )
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __reduce__(self):
+        return (type(self), (self.operand,))
 
     def __repr__(self):
         return f"Not({self.operand})"
 
-    def evaluate(self, model):
-        return not self.operand.evaluate(model)
+    def evaluate(self, model, memo=None):
+        return not self.operand.evaluate(model, memo)
 
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
-
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        return cls.intern(
+            (cls, conjuncts),
+            hash(("and", tuple(hash(conjunct) for conjunct in conjuncts))),
+            frozenset().union(*[conjunct.symbol_set for conjunct in conjuncts]),
+            conjuncts, conjuncts=conjuncts
         )
 
+    def __reduce__(self):
+        return (type(self), self.conjuncts)
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -114,11 +165,14 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        raise TypeError(
+            "sentences are immutable, so And.add cannot add a conjunct; "
+            "use And(*sentence.conjuncts, conjunct) to build a new sentence, "
+            "or KnowledgeBase.tell to add knowledge"
+        )
 
-    def evaluate(self, model):
-        return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
+    def truth(self, model, memo):
+        return all(conjunct.evaluate(model, memo) for conjunct in self.conjuncts)
 
     def formula(self):
         if len(self.conjuncts) == 1:
@@ -126,30 +180,29 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        return cls.intern(
+            (cls, disjuncts),
+            hash(("or", tuple(hash(disjunct) for disjunct in disjuncts))),
+            frozenset().union(*[disjunct.symbol_set for disjunct in disjuncts]),
+            disjuncts, disjuncts=disjuncts
         )
 
+    def __reduce__(self):
+        return (type(self), self.disjuncts)
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
-    def evaluate(self, model):
-        return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
+    def truth(self, model, memo):
+        return any(disjunct.evaluate(model, memo) for disjunct in self.disjuncts)
 
     def formula(self):
         if len(self.disjuncts) == 1:
@@ -157,76 +210,87 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return cls.intern(
+            (cls, antecedent, consequent),
+            hash(("implies", hash(antecedent), hash(consequent))),
+            antecedent.symbol_set | consequent.symbol_set,
+            [antecedent, consequent], antecedent=antecedent, consequent=consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def __reduce__(self):
+        return (type(self), (self.antecedent, self.consequent))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
-    def evaluate(self, model):
-        return ((not self.antecedent.evaluate(model))
-                or self.consequent.evaluate(model))
+    def truth(self, model, memo):
+        return ((not self.antecedent.evaluate(model, memo))
+                or self.consequent.evaluate(model, memo))
 
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
-
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return cls.intern(
+            (cls, left, right),
+            hash(("biconditional", hash(left), hash(right))),
+            left.symbol_set | right.symbol_set,
+            [left, right], left=left, right=right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def __reduce__(self):
+        return (type(self), (self.left, self.right))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
-    def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+    def truth(self, model, memo):
+        return self.left.evaluate(model, memo) == self.right.evaluate(model, memo)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+def model_check(knowledge, query, method="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    method "enumerate" evaluates the sentences in every model, "cnf"
+    compiles them to clauses first and enumerates models as bitmasks,
+    "sat" asks a SAT solver whether knowledge ∧ ¬query has any model,
+    "vectorized" evaluates chunks of models at once with NumPy, and
+    "parallel" enumerates chunks of models in a pool of processes.
+    """
+    if method != "enumerate":
+        # Imported here because the other methods build on this module
+        if method == "cnf":
+            from cnf import model_check as check
+        elif method == "sat":
+            from sat import model_check as check
+        elif method == "vectorized":
+            from vectorized import model_check as check
+        elif method == "parallel":
+            from parallel import model_check as check
+        else:
+            raise ValueError(f"unknown model checking method {method!r}")
+        return check(knowledge, query)
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -234,9 +298,11 @@ def model_check(knowledge, query):
         # If model has an assignment for each symbol
         if not symbols:
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+            # If knowledge base is true in model, then query must also be true,
+            # evaluating subformulas shared between them once
+            memo = {}
+            if knowledge.evaluate(model, memo):
+                return query.evaluate(model, memo)
             return True
         else:
 
@@ -257,7 +323,7 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
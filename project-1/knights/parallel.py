@@ -0,0 +1,140 @@
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import time
+
+from generator import chain
+from logic import model_check as check_all
+
+# How many models a worker checks between looking for a counter-model
+# found by another worker
+CHECK_INTERVAL = 256
+
+# With this many symbols or fewer, checking every model in this process
+# takes less time than starting a pool of workers
+SERIAL_SYMBOLS = 12
+
+# Set by whichever worker first finds a counter-model, so the rest stop
+found = None
+knowledge = None
+query = None
+free_symbols = None
+
+
+def init_worker(event, worker_knowledge, worker_query, worker_free_symbols):
+    global found, knowledge, query, free_symbols
+    found = event
+    knowledge = worker_knowledge
+    query = worker_query
+    free_symbols = worker_free_symbols
+
+
+def check_chunk(fixed):
+    """
+    Checks if knowledge entails query in every model that extends a fixed
+    assignment, given as (symbol, value) pairs. Returns None if another
+    worker found a counter-model first.
+    """
+    # Chunks still queued when a counter-model turns up return at once
+    if found.is_set():
+        return None
+    model = dict(fixed)
+    checked = 0
+
+    def check_all(index):
+        """Checks every model that extends the assignment of the symbols before index."""
+        nonlocal checked
+        if index == len(free_symbols):
+            checked += 1
+            if checked % CHECK_INTERVAL == 0 and found.is_set():
+                return None
+            memo = {}
+            if knowledge.evaluate(model, memo) and not query.evaluate(model, memo):
+                found.set()
+                return False
+            return True
+
+        # Assign the symbol in place rather than copying the model for each branch
+        for value in [True, False]:
+            model[free_symbols[index]] = value
+            entailed = check_all(index + 1)
+            if not entailed:
+                return entailed
+        return True
+
+    return check_all(0)
+
+
+def model_check(knowledge, query, processes=None, split_bits=None):
+    """
+    Checks if knowledge base entails query by splitting the models into
+    chunks that fix the first split_bits symbols and checking the chunks in
+    a pool of processes. By default there are about four chunks per process.
+    Small problems are checked in this process instead.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    if len(symbols) <= SERIAL_SYMBOLS:
+        return check_all(knowledge, query)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if split_bits is None:
+        split_bits = math.ceil(math.log2(4 * processes))
+    split_bits = min(split_bits, len(symbols))
+    fixed_symbols = symbols[:split_bits]
+    chunks = [
+        list(zip(fixed_symbols, values))
+        for values in itertools.product([True, False], repeat=split_bits)
+    ]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    event = context.Event()
+
+    # Terminating the pool while chunks are still queued can deadlock, so
+    # on a counter-model tell the workers to stop and wait for them instead
+    pool = context.Pool(processes, initializer=init_worker,
+                        initargs=(event, knowledge, query, symbols[split_bits:]))
+    entailed = True
+    try:
+        for result in pool.imap_unordered(check_chunk, chunks):
+            if result is False:
+                event.set()
+                entailed = False
+                break
+    finally:
+        pool.close()
+        pool.join()
+    return entailed
+
+
+def main():
+    """Times the recursive check_all against the parallel check with several pool sizes."""
+    parser = argparse.ArgumentParser(description="Benchmark parallel model checking.")
+    parser.add_argument("--people", type=int, default=8,
+                        help="puzzle size, with two symbols per person")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4],
+                        help="pool sizes to time")
+    args = parser.parse_args()
+
+    knowledge, symbols = chain(args.people)
+    print(f"{os.cpu_count()} CPUs available, {len(symbols)} symbols")
+    # The last person is a knight or a knave, so one query is entailed and the other is not
+    for query in [symbols[args.people - 1], symbols[-1]]:
+        start = time.perf_counter()
+        answer = check_all(knowledge, query)
+        serial = time.perf_counter() - start
+        print(f"{query} ({'entailed' if answer else 'not entailed'}): check_all {serial:.3f}s")
+        for processes in args.processes:
+            start = time.perf_counter()
+            if model_check(knowledge, query, processes) != answer:
+                raise AssertionError("check_all and parallel disagree")
+            elapsed = time.perf_counter() - start
+            print(f"    {processes:>2} processes: {elapsed:.3f}s, {serial / elapsed:.2f}x speedup")
+
+
+if __name__ == "__main__":
+    main()
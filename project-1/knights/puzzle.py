@@ -2,6 +2,9 @@
 # Use AI to solve "Knights and Knaves" style puzzles given a
 # knowledge base by the user
 
+import argparse
+
+from knowledge import KnowledgeBase
 from logic import *
 
 AKnight = Symbol("A is a Knight")
@@ -111,6 +114,11 @@ knowledge3 = And(
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Solve the knights and knaves puzzles.")
+    parser.add_argument("--method", choices=["kb", "enumerate", "cnf", "sat", "vectorized", "parallel"], default="kb",
+                        help="ask a KnowledgeBase, or call model_check with this method for each symbol")
+    args = parser.parse_args()
+
     symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
     puzzles = [
         ("Puzzle 0", knowledge0),
@@ -122,9 +130,15 @@ def main():
         print(puzzle)
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
+        elif args.method == "kb":
+            # Tell the knowledge base each sentence once, then ask about every symbol
+            knowledgeBase = KnowledgeBase(*knowledge.conjuncts)
+            for symbol in symbols:
+                if knowledgeBase.ask(symbol):
+                    print(f"    {symbol}")
         else:
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if model_check(knowledge, symbol, args.method):
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,239 @@
+from cnf import clauses
+
+# How much the activity of the variables in a conflict is bumped relative
+# to older conflicts: each conflict raises the increment by 1 / DECAY
+DECAY = 0.95
+
+
+class Solver():
+    """
+    CDCL SAT solver: DPLL search with unit propagation over two watched
+    literals, learning a clause from each conflict and jumping back to the
+    decision level that clause is asserting at.
+
+    Variables are numbered from 1, and literals are variables (true) or
+    negated variables (false), as in the DIMACS format.
+    """
+
+    def __init__(self, num_variables):
+        self.num_variables = num_variables
+
+        # Value (1, -1, or 0 if unassigned), decision level and reason
+        # clause of each variable, and the literals assigned so far in order
+        self.values = [0] * (num_variables + 1)
+        self.levels = [0] * (num_variables + 1)
+        self.reasons = [None] * (num_variables + 1)
+        self.trail = []
+        self.trail_limits = []
+        self.propagated = 0
+
+        # Clauses watching each literal, which are visited when it becomes
+        # false. The watched literals of a clause are its first two.
+        self.watches = {}
+        self.learned = 0
+        self.unsatisfiable = False
+
+        self.activity = [0.0] * (num_variables + 1)
+        self.increment = 1.0
+        self.phases = [False] * (num_variables + 1)
+
+        self.conflicts = 0
+        self.decisions = 0
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def watch(self, literal, clause):
+        self.watches.setdefault(literal, []).append(clause)
+
+    def add_clause(self, literals):
+        """
+        Adds a clause given as a list of literals. Returns False if the
+        clauses added so far are unsatisfiable.
+        """
+        if self.unsatisfiable:
+            return False
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                return True
+            if literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            value = self.value(clause[0])
+            if value == -1:
+                self.unsatisfiable = True
+            elif value == 0:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause[0], clause)
+            self.watch(clause[1], clause)
+        return not self.unsatisfiable
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a clause
+        whose literals are all false, or None if there is no conflict.
+        """
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+            watching = self.watches.get(false_literal, [])
+            kept = []
+            self.watches[false_literal] = kept
+            for position, clause in enumerate(watching):
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if self.value(other) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watch(clause[1], clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(other) == -1:
+                        kept.extend(watching[position + 1:])
+                        return clause
+                    self.assign(other, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (clause, level): the clause learned from a conflict, cut at
+        the first unique implication point with the literal to assert
+        first, and the decision level to jump back to.
+        """
+        current = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == current:
+                    pending += 1
+                else:
+                    learned.append(literal)
+
+            # Resolve on the most recently assigned literal of this level
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+
+        # The literal assigned deepest after the asserting one is watched second
+        deepest = max(range(1, len(learned)), key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+
+    def backtrack(self, level):
+        """Undoes every assignment made above a decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.values[variable] = 0
+            self.reasons[variable] = None
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.propagated = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        best = None
+        for variable in range(1, self.num_variables + 1):
+            if self.values[variable] == 0 and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self):
+        """Checks if the clauses are satisfiable, leaving a model in values if so."""
+        if self.unsatisfiable:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned[0], learned)
+                    self.watch(learned[1], learned)
+                    self.learned += 1
+                    self.assign(learned[0], learned)
+                self.increment /= DECAY
+            else:
+                variable = self.decide()
+                if variable is None:
+                    return True
+                self.decisions += 1
+                self.trail_limits.append(len(self.trail))
+                self.assign(variable if self.phases[variable] else -variable, None)
+
+    def model(self):
+        """Returns the truth value of each variable, indexed from 1."""
+        return [None] + [value == 1 for value in self.values[1:]]
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query by showing knowledge ∧ ¬query is unsatisfiable."""
+    # Subformulas whose clauses would multiply out are given variables of
+    # their own, numbered after the symbols
+    definitions = {}
+    encoded = clauses(knowledge, definitions=definitions) \
+        + clauses(query, negated=True, definitions=definitions)
+    names = sorted(knowledge.symbols() | query.symbols()) + list(definitions)
+    variables = {name: i + 1 for i, name in enumerate(names)}
+    solver = Solver(len(names))
+    for clause in encoded:
+        if not solver.add_clause([
+            variables[name] if value else -variables[name] for name, value in clause
+        ]):
+            return True
+    return not solver.solve()
@@ -0,0 +1,61 @@
+import random
+
+from cnf import MAX_CLAUSES, clauses, compile_cnf, model_check
+from generator import generate
+from logic import Biconditional, Not, Symbol, model_check as check_all
+
+
+def biconditional_chain(length):
+    """Returns x0 <=> (x1 <=> (... <=> xn)) and its symbols."""
+    symbols = [Symbol(f"x{i}") for i in range(length)]
+    sentence = symbols[-1]
+    for symbol in reversed(symbols[:-1]):
+        sentence = Biconditional(symbol, sentence)
+    return sentence, symbols
+
+
+def models(names):
+    for bits in range(1 << len(names)):
+        yield bits, {name: bool(bits >> i & 1) for i, name in enumerate(names)}
+
+
+def test_compiled_sentences_are_equivalent():
+    for seed in range(100):
+        knowledge, _, _ = generate(3, depth=3, seed=seed)
+        names = sorted(knowledge.symbols())
+        for limit in [1, 2, 4, MAX_CLAUSES]:
+            for sentence in [knowledge, Not(knowledge)]:
+                compiled = compile_cnf(sentence, names, limit)
+                for bits, model in models(names):
+                    assert compiled.evaluate(bits) == sentence.evaluate(model)
+
+
+def test_biconditional_chain_stays_small():
+    sentence, symbols = biconditional_chain(17)
+    names = [symbol.name for symbol in symbols]
+    assert len(clauses(sentence)) < 1000
+    assert len(clauses(sentence, negated=True)) < 1000
+
+    compiled = compile_cnf(sentence, names)
+    assert compiled.definitions
+    rng = random.Random(0)
+    for _ in range(1000):
+        bits = rng.getrandbits(len(names))
+        model = {name: bool(bits >> i & 1) for i, name in enumerate(names)}
+        assert compiled.evaluate(bits) == sentence.evaluate(model)
+
+
+def test_shared_definitions_are_defined_once():
+    sentence, _ = biconditional_chain(17)
+    definitions = {}
+    first = clauses(sentence, definitions=definitions)
+    second = clauses(sentence, definitions=definitions)
+    assert definitions
+    assert len(second) < len(first)
+
+
+def test_model_check_matches_enumeration():
+    for seed in range(20):
+        knowledge, symbols, _ = generate(3, seed=seed)
+        for symbol in symbols:
+            assert model_check(knowledge, symbol) == check_all(knowledge, symbol)
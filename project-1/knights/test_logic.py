@@ -0,0 +1,40 @@
+import gc
+import pickle
+
+import pytest
+
+from generator import generate
+from logic import MEMO_SIZE, And, Biconditional, Implication, Not, Or, Symbol
+
+
+def test_and_add_raises():
+    knowledge = And(Symbol("A"))
+    with pytest.raises(TypeError, match="immutable"):
+        knowledge.add(Symbol("B"))
+    assert knowledge.conjuncts == (Symbol("A"),)
+
+
+def test_equal_sentences_are_interned():
+    a, b = Symbol("A"), Symbol("B")
+    assert Implication(a, Or(a, Not(b))) is Implication(Symbol("A"), Or(a, Not(Symbol("B"))))
+    assert pickle.loads(pickle.dumps(Biconditional(a, b))) is Biconditional(a, b)
+
+
+def test_memoize_does_not_depend_on_other_sentences():
+    knowledge, _, _ = generate(3, depth=3, seed=0)
+    shared = max(knowledge.conjuncts, key=lambda conjunct: conjunct.size)
+    before = shared.memoize
+    parents = [And(shared, Symbol(f"X{i}")) for i in range(3)]
+    assert shared.memoize == before == (shared.size >= MEMO_SIZE)
+    del parents
+    gc.collect()
+    assert shared.memoize == before
+
+
+def test_memoized_evaluation_matches():
+    for seed in range(20):
+        knowledge, symbols, solution = generate(4, depth=3, seed=seed)
+        model = dict(solution)
+        for symbol in symbols[:3]:
+            model[symbol.name] = not model[symbol.name]
+            assert knowledge.evaluate(model, {}) == knowledge.evaluate(model)
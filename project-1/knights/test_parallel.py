@@ -0,0 +1,36 @@
+import multiprocessing
+import threading
+
+import parallel
+from generator import chain
+from logic import model_check as check_all
+
+
+def test_small_problems_skip_the_pool(monkeypatch):
+    def get_context(*args):
+        raise AssertionError("a pool was started")
+
+    monkeypatch.setattr(multiprocessing, "get_context", get_context)
+    knowledge, symbols = chain(parallel.SERIAL_SYMBOLS // 2)
+    for symbol in symbols:
+        assert parallel.model_check(knowledge, symbol) == check_all(knowledge, symbol)
+
+
+def test_pool_matches_enumeration():
+    people = parallel.SERIAL_SYMBOLS // 2 + 1
+    knowledge, symbols = chain(people)
+    queries = [symbols[people - 1], symbols[-1]]
+    expected = [check_all(knowledge, query) for query in queries]
+    answers = []
+
+    def check():
+        # Stopping the pool early used to deadlock now and then, so repeat
+        for _ in range(20):
+            answers.append([parallel.model_check(knowledge, query, processes=2) for query in queries])
+
+    # Run in a daemon thread so a deadlock fails the test instead of hanging it
+    thread = threading.Thread(target=check, daemon=True)
+    thread.start()
+    thread.join(timeout=120)
+    assert not thread.is_alive(), "parallel model_check did not finish"
+    assert answers == [expected] * 20
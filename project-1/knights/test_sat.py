@@ -0,0 +1,36 @@
+import time
+
+from generator import generate
+from logic import And, Not, model_check as check_all
+from sat import model_check
+from test_cnf import biconditional_chain
+
+
+def test_model_check_matches_enumeration():
+    for seed in range(20):
+        knowledge, symbols, _ = generate(3, seed=seed)
+        for symbol in symbols:
+            assert model_check(knowledge, symbol) == check_all(knowledge, symbol)
+            assert model_check(knowledge, Not(symbol)) == check_all(knowledge, Not(symbol))
+
+
+def test_biconditional_chain_scales():
+    # Far beyond what enumerating 2 ** 64 models could check, and the
+    # distributed clauses of the chain alone would not fit in memory
+    sentence, symbols = biconditional_chain(64)
+    knowledge = And(sentence, *symbols[1:])
+    model = {symbol.name: True for symbol in symbols}
+    first = sentence.evaluate(model)
+
+    start = time.perf_counter()
+    assert model_check(knowledge, symbols[0]) == first
+    assert model_check(knowledge, Not(symbols[0])) == (not first)
+    assert time.perf_counter() - start < 10
+
+
+def test_generated_puzzles_agree_with_their_solutions():
+    for people in [16, 24]:
+        knowledge, symbols, solution = generate(people, depth=3, seed=people)
+        for symbol in symbols:
+            if model_check(knowledge, symbol):
+                assert solution[symbol.name]
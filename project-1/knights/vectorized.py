@@ -0,0 +1,136 @@
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from generator import chain
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check as check_all
+
+# Models are checked in chunks of 2 ** CHUNK_BITS at a time, packed 64 to a
+# uint64 word, so each intermediate truth table takes 2 ** (CHUNK_BITS - 3)
+# bytes however many symbols there are
+CHUNK_BITS = 16
+WORD_BITS = 6
+
+ALL_ONES = (1 << 64) - 1
+
+# Bit b of LOW_COLUMNS[i] is set if bit i of b is set, giving the truth
+# tables of the symbols that vary within a single word
+LOW_COLUMNS = [
+    sum(1 << b for b in range(1 << WORD_BITS) if b >> i & 1)
+    for i in range(WORD_BITS)
+]
+
+
+def chunk_columns(low_bits):
+    """
+    Returns the packed truth tables of the first low_bits symbols over a
+    chunk of 2 ** low_bits models, and a mask of the bits that are models.
+    """
+    words = 1 << max(0, low_bits - WORD_BITS)
+    columns = []
+    for i in range(low_bits):
+        if i < WORD_BITS:
+            columns.append(np.full(words, LOW_COLUMNS[i], dtype=np.uint64))
+        else:
+            # Whole words are true or false for the symbols above the first 6
+            indexes = np.arange(words, dtype=np.uint64)
+            columns.append(np.where(
+                (indexes >> np.uint64(i - WORD_BITS)) & np.uint64(1),
+                np.uint64(ALL_ONES), np.uint64(0)
+            ))
+    valid = np.full(words, (1 << min(1 << low_bits, 64)) - 1, dtype=np.uint64)
+    return columns, valid
+
+
+def truth_table(sentence, values, memo):
+    """
+    Returns the packed truth table of a sentence over a chunk of models,
+    where values maps each symbol name to its column, or to a scalar of all
+    ones or all zeros if the symbol is fixed across the chunk.
+    """
+    if sentence in memo:
+        return memo[sentence]
+    if isinstance(sentence, Symbol):
+        bits = values[sentence.name]
+    elif isinstance(sentence, Not):
+        bits = ~truth_table(sentence.operand, values, memo)
+    elif isinstance(sentence, And):
+        bits = np.uint64(ALL_ONES)
+        for conjunct in sentence.conjuncts:
+            bits = bits & truth_table(conjunct, values, memo)
+    elif isinstance(sentence, Or):
+        bits = np.uint64(0)
+        for disjunct in sentence.disjuncts:
+            bits = bits | truth_table(disjunct, values, memo)
+    elif isinstance(sentence, Implication):
+        bits = ~truth_table(sentence.antecedent, values, memo) \
+            | truth_table(sentence.consequent, values, memo)
+    elif isinstance(sentence, Biconditional):
+        bits = ~(truth_table(sentence.left, values, memo)
+                 ^ truth_table(sentence.right, values, memo))
+    else:
+        raise TypeError(f"cannot evaluate {sentence!r}")
+    memo[sentence] = bits
+    return bits
+
+
+def model_check(knowledge, query, chunk_bits=CHUNK_BITS):
+    """
+    Checks if knowledge base entails query by evaluating both over chunks of
+    2 ** chunk_bits models at a time with vectorized bitwise operations.
+    """
+    if np is None:
+        raise ImportError("the vectorized method requires NumPy (pip install numpy)")
+
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    low_bits = min(len(symbols), chunk_bits)
+    columns, valid = chunk_columns(low_bits)
+    values = dict(zip(symbols, columns))
+    ones = np.uint64(ALL_ONES)
+    zeros = np.uint64(0)
+
+    # Each chunk fixes the symbols that do not vary within it
+    high = symbols[low_bits:]
+    for chunk in range(1 << len(high)):
+        for i, name in enumerate(high):
+            values[name] = ones if chunk >> i & 1 else zeros
+        memo = {}
+        counter_models = truth_table(knowledge, values, memo) \
+            & ~truth_table(query, values, memo) & valid
+        if np.any(counter_models):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized model checking.")
+    parser.add_argument("--people", type=int, nargs="+", default=[3, 5, 7, 9, 11, 12],
+                        help="puzzle sizes to time, with two symbols per person")
+    parser.add_argument("--max-recursive", type=int, default=18,
+                        help="largest number of symbols to time the recursive check_all on")
+    args = parser.parse_args()
+
+    print(f"{'symbols':>7} {'check_all':>10} {'vectorized':>10}")
+    for people in args.people:
+        knowledge, symbols = chain(people)
+        query = symbols[people - 1]
+
+        start = time.perf_counter()
+        answer = model_check(knowledge, query)
+        vectorized = time.perf_counter() - start
+
+        recursive = "-"
+        if len(symbols) <= args.max_recursive:
+            start = time.perf_counter()
+            if check_all(knowledge, query) != answer:
+                raise AssertionError(f"check_all and vectorized disagree with {people} people")
+            recursive = f"{time.perf_counter() - start:.3f}s"
+        print(f"{len(symbols):>7} {recursive:>10} {vectorized:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()